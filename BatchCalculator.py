@@ -0,0 +1,199 @@
+import numpy as np
+
+from HomeCalculator import PARAMETERS
+
+# Output columns produced for every scenario
+RESULTS = (
+    'monthly_payment',
+    'total_buying_cost',
+    'total_rent_paid',
+    'total_investment_value',
+    'property_future_value',
+    'diff',
+)
+
+# Extra columns in today's money when an inflation rate is given
+REAL_RESULTS = (
+    'real_total_buying_cost',
+    'real_total_rent_paid',
+    'real_total_investment_value',
+    'real_property_future_value',
+    'real_diff',
+)
+
+
+class BatchCalculator:
+    """Evaluate many HomeCalculator scenarios at once on NumPy arrays.
+
+    Every input may be a scalar or an array; inputs are broadcast against each
+    other. The totals use the closed-form sums of the CostTable columns, so no
+    per-scenario table is ever built.
+
+    With `tranches` (see MortgageModel) the loan is a split mortgage: the
+    payment sums come from its segment-wise schedule instead of the fixed
+    annuity, monthly_payment is the first month's payment and any balance
+    still owed at the end of `years` is deducted from the buyer's side.
+
+    With `inflation` (annual %, scalar or per scenario) the REAL_RESULTS give
+    the totals in today's money: every monthly cost is discounted to month 0
+    and the end-of-horizon values are deflated, using the same closed forms
+    as the investment value evaluated at the inflation rate.
+    """
+
+    def __init__(
+        self,
+        years,
+        capital,
+        purchase_cost,
+        monthly_maintenance,
+        rent,
+        rent_increase,
+        alternative_investment_increase,
+        property_value,
+        property_value_increase,
+        interest_rate,
+        tranches=None,
+        inflation=None,
+    ):
+        (
+            years,
+            self.capital,
+            self.purchase_cost,
+            self.monthly_maintenance,
+            self.rent,
+            self.rent_increase,
+            self.alternative_investment_increase,
+            self.property_value,
+            self.property_value_increase,
+            self.interest_rate,
+        ) = np.broadcast_arrays(*[
+            np.asarray(value, dtype=np.float64) for value in (
+                years, capital, purchase_cost, monthly_maintenance, rent, rent_increase,
+                alternative_investment_increase, property_value, property_value_increase, interest_rate,
+            )
+        ])
+        # Truncate years the same way HomeCalculator does with int(years)
+        self.years = np.trunc(years)
+        self.mortgage = self.property_value + self.purchase_cost - self.capital
+        self.total_rent_paid = self.rent * 12 * self.yearly_growth_sum(self.rent_increase / 100, self.years)
+        self.property_future_value = self.property_value * (1 + self.property_value_increase / 100) ** self.years
+        if tranches is None:
+            self.monthly_payment = self.monthly_mortgage(self.mortgage, self.interest_rate / 100, self.years)
+            monthly_cost = self.monthly_payment + self.monthly_maintenance
+            self.total_buying_cost = self.capital + monthly_cost * self.years * 12
+            self.total_investment_value = self.investment_value(monthly_cost)
+            self.diff = self.property_future_value - self.total_investment_value
+        else:
+            from MortgageModel import MortgageModel
+
+            shape = self.mortgage.shape
+            model = MortgageModel(self.mortgage.reshape(-1), self.years.reshape(-1), tranches)
+            total_paid, compounded, remaining = (
+                value.reshape(shape) for value in model.totals(self.years.reshape(-1), self.alternative_investment_increase.reshape(-1))
+            )
+            self.monthly_payment = model.payment[:, 1].reshape(shape)
+            self.total_buying_cost = self.capital + total_paid + self.monthly_maintenance * self.years * 12
+            self.total_investment_value = self.investment_value(self.monthly_maintenance) + compounded
+            self.diff = self.property_future_value - remaining - self.total_investment_value
+
+        self.inflation = inflation
+        if inflation is not None:
+            i = np.broadcast_to(np.asarray(inflation, dtype=np.float64) / 100, self.years.shape)
+            growth, months_factor, year_factor = self.compounding_factors(i, self.years)
+            deflator = 1 / growth
+            # Monthly costs compounded to the horizon at the inflation rate, then deflated,
+            # are their values discounted to month 0
+            if tranches is None:
+                buying = monthly_cost * months_factor
+            else:
+                payments = model.totals(self.years.reshape(-1), (i * 100).reshape(-1))[1].reshape(shape)
+                buying = self.monthly_maintenance * months_factor + payments
+            self.real_total_buying_cost = self.capital + buying * deflator
+            rent_factor = self.rent_factor(i, self.rent_increase / 100, self.years, growth)
+            self.real_total_rent_paid = self.rent * year_factor * rent_factor * deflator
+            self.real_total_investment_value = self.total_investment_value * deflator
+            self.real_property_future_value = self.property_future_value * deflator
+            self.real_diff = self.diff * deflator
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch from a structured array, DataFrame or mapping of columns"""
+        return cls(**{name: records[name] for name in PARAMETERS})
+
+    @staticmethod
+    def monthly_mortgage(loan_amount, interest_rate, years):
+        r = interest_rate / 12 # monthly interest rate
+        n = years * 12 # number of months / total payments
+        growth = (1 + r) ** n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # An interest-free loan is repaid in equal parts
+            return np.where(r == 0, loan_amount / n, loan_amount * (r * growth) / (growth - 1))
+
+    @staticmethod
+    def yearly_growth_sum(rate, years):
+        """Sum of (1 + rate) ** y for y in range(years)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(rate == 0, years, np.expm1(years * np.log1p(rate)) / rate)
+
+    def investment_value(self, monthly_cost):
+        """Closed form of CostTable.total_investment_value()
+
+        The investment column compounds every monthly difference to the end of
+        the horizon, so its sum splits into the compounded capital, a geometric
+        series of the fixed buying cost and a year-by-year series of the rent.
+        """
+        a = self.alternative_investment_increase / 100
+        growth, months_factor, year_factor = self.compounding_factors(a, self.years)
+        rent_factor = self.rent_factor(a, self.rent_increase / 100, self.years, growth)
+        return self.capital * growth + monthly_cost * months_factor - self.rent * year_factor * rent_factor
+
+    @staticmethod
+    def compounding_factors(rate, years):
+        """(1 + rate) ** years, and the value at the horizon of 1 paid every month and of 1 paid every month of a year"""
+        log_rate = np.log1p(rate)
+        growth = np.exp(years * log_rate)
+        monthly_rate = np.expm1(log_rate / 12)  # (1 + rate) ** (1/12) - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Sum of the monthly compounding factors over all months, and over one year
+            months_factor = np.where(rate == 0, years * 12, np.expm1(years * log_rate) / monthly_rate)
+            year_factor = np.where(rate == 0, 12, rate / monthly_rate)
+        return growth, months_factor, year_factor
+
+    @staticmethod
+    def rent_factor(a, g, years, growth):
+        """Sum over y of (1 + g) ** y * (1 + a) ** (years - 1 - y), where growth is (1 + a) ** years
+
+        Summed as in CostTable.rent_factor, a geometric series in (1 + g) / (1 + a)
+        that stays accurate when a and g are close but not equal.
+        """
+        d = np.log1p(g) - np.log1p(a)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return growth / (1 + a) * np.where(d == 0, years, np.expm1(years * d) / np.expm1(d))
+
+    def results(self):
+        """Return the result vectors keyed by name, with the REAL_RESULTS when an inflation rate was given"""
+        names = RESULTS if self.inflation is None else RESULTS + REAL_RESULTS
+        return {name: getattr(self, name) for name in names}
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    size = 1_000_000
+    scenarios = dict(
+        years=rng.integers(1, 41, size),
+        capital=rng.uniform(100000, 1000000, size),
+        purchase_cost=rng.uniform(0, 200000, size),
+        monthly_maintenance=rng.uniform(0, 1000, size),
+        rent=rng.uniform(1000, 10000, size),
+        rent_increase=rng.uniform(0, 6, size),
+        alternative_investment_increase=rng.uniform(0, 10, size),
+        property_value=rng.uniform(1000000, 3000000, size),
+        property_value_increase=rng.uniform(0, 8, size),
+        interest_rate=rng.uniform(1, 10, size),
+    )
+    start = time.perf_counter()
+    batch = BatchCalculator(**scenarios)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {size:,} scenarios in {elapsed:.3f}s ({size / elapsed:,.0f} scenarios/sec)")
@@ -0,0 +1,144 @@
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from BatchCalculator import BatchCalculator, PARAMETERS
+
+
+class _Failure:
+    """Carries an exception from a background thread to the consumer"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=2):
+    """Iterate over iterable in a background thread, keeping at most depth items ready"""
+    items = queue.Queue(maxsize=depth)
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except BaseException as e:
+            items.put(_Failure(e))
+            return
+        items.put(_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+def read_batches(path, batch_size, format=None):
+    """Yield record batches of a CSV or Parquet file as mappings of column name to array"""
+    format = format or ('parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv')
+    if format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield {name: column.to_numpy(zero_copy_only=False) for name, column in zip(batch.schema.names, batch.columns)}
+    else:
+        import pandas as pd
+
+        source = sys.stdin if path == '-' else path
+        with pd.read_csv(source, chunksize=batch_size) as reader:
+            for chunk in reader:
+                yield {name: chunk[name].to_numpy() for name in chunk.columns}
+
+
+class BatchPipeline:
+    """Evaluate a scenario file batch by batch and stream the results to a ResultWriter.
+
+    Reading runs in a background thread and writing in another, so file I/O
+    overlaps with the vectorized evaluation, and at most a few batches are in
+    memory at once however large the file is. Input columns are passed
+    through; parameters missing from the file are taken from `defaults`.
+    `tranches` (see MortgageModel) apply to every scenario; an `inflation`
+    rate adds the REAL_RESULTS columns.
+    """
+
+    def __init__(self, input_path, writer, batch_size=100_000, defaults=None, input_format=None, progress=True,
+                 tranches=None, inflation=None):
+        self.input_path = input_path
+        self.writer = writer
+        self.batch_size = int(batch_size)
+        self.defaults = defaults or {}
+        self.input_format = input_format
+        self.progress = progress
+        self.tranches = tranches
+        self.inflation = inflation
+        self.rows = 0
+
+    def evaluate(self, columns):
+        """Append the result columns to one batch of input columns"""
+        params = {}
+        for name in PARAMETERS:
+            if name in columns:
+                params[name] = columns[name]
+            elif name in self.defaults:
+                params[name] = self.defaults[name]
+            else:
+                raise ValueError(f"Input is missing the '{name}' column and no default was given")
+        rows = len(next(iter(columns.values())))
+        results = BatchCalculator(**params, tranches=self.tranches, inflation=self.inflation).results()
+        output = dict(columns)
+        output.update({name: np.broadcast_to(values, (rows,)) for name, values in results.items()})
+        return output
+
+    def run(self):
+        """Process the whole input and return the number of rows written"""
+        pending = queue.Queue(maxsize=2)
+        failure = []
+
+        def write():
+            while True:
+                columns = pending.get()
+                if columns is _DONE:
+                    return
+                if failure:
+                    continue
+                try:
+                    self.writer.write(columns)
+                except BaseException as e:
+                    failure.append(e)
+
+        writer_thread = threading.Thread(target=write, daemon=True)
+        writer_thread.start()
+        start = last_report = time.perf_counter()
+        try:
+            for columns in prefetch(read_batches(self.input_path, self.batch_size, self.input_format)):
+                if failure:
+                    break
+                pending.put(self.evaluate(columns))
+                self.rows += len(next(iter(columns.values())))
+                now = time.perf_counter()
+                if self.progress and now - last_report >= 1:
+                    self.report(now - start)
+                    last_report = now
+        finally:
+            pending.put(_DONE)
+            writer_thread.join()
+        if failure:
+            raise failure[0]
+        if self.progress:
+            self.report(time.perf_counter() - start, final=True)
+        return self.rows
+
+    def report(self, elapsed, final=False):
+        rate = self.rows / elapsed if elapsed > 0 else 0
+        end = '\n' if final else ''
+        print(f"\r📈  {self.rows:>12,} rows  {rate:>12,.0f} rows/sec", end=end, file=sys.stderr, flush=True)
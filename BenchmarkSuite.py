@@ -0,0 +1,288 @@
+from collections import defaultdict
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from BatchCalculator import BatchCalculator
+from CostTable import CostTable
+from HomeCalculator import HomeCalculator
+from IncrementalCalculator import IncrementalCalculator
+
+DEFAULT_SCENARIO = dict(
+    years=10,
+    capital=500000,
+    purchase_cost=110000,
+    monthly_maintenance=200,
+    rent=4200,
+    rent_increase=3,
+    alternative_investment_increase=7,
+    property_value=1600000,
+    property_value_increase=4.5,
+    interest_rate=5,
+)
+
+HORIZONS = (1, 10, 20, 30, 40)
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """Median seconds per call of func, calling it in loops that last at least min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+def peak_memory(func):
+    """Peak bytes allocated by Python and NumPy while running func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def random_scenarios(size, years, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(
+        years=np.full(size, years),
+        capital=rng.uniform(100000, 1000000, size),
+        purchase_cost=rng.uniform(0, 200000, size),
+        monthly_maintenance=rng.uniform(0, 1000, size),
+        rent=rng.uniform(1000, 10000, size),
+        rent_increase=rng.uniform(0, 6, size),
+        alternative_investment_increase=rng.uniform(0, 10, size),
+        property_value=rng.uniform(1000000, 3000000, size),
+        property_value_increase=rng.uniform(0, 8, size),
+        interest_rate=rng.uniform(1, 10, size),
+    )
+
+
+class _FakeWidget:
+    """Stand-in for Tk widgets when no display is available"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _noop(self, *args, **kwargs):
+        pass
+
+    grid = destroy = columnconfigure = rowconfigure = configure = config = _noop
+
+
+class _FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def gui_update_benchmark():
+    """Return a callable that runs HomeCalculatorGUI._update_results once.
+
+    Uses a real Tk root when a display is available and a mocked widget set
+    otherwise, so it also runs headless on build machines.
+    """
+    import tkinter as tk
+    import HomeCalculatorGUI
+
+    # The GUI always passes an inflation rate, so its summaries include the real figures
+    args = dict(DEFAULT_SCENARIO, inflation=0)
+    summary = HomeCalculator(**args).summary()
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        gui = HomeCalculatorGUI.HomeCalculatorGUI(root)
+
+        def update():
+            gui._update_results(args, summary)
+            root.update_idletasks()
+        return update
+    except tk.TclError:
+        pass
+
+    # The result labels exist once and _update_results only changes their text
+    gui = HomeCalculatorGUI.HomeCalculatorGUI.__new__(HomeCalculatorGUI.HomeCalculatorGUI)
+    gui.results_widgets = defaultdict(_FakeWidget)
+    gui.result_vars = defaultdict(_FakeVar)
+    gui.status_var = _FakeVar()
+    gui._recommendation_color = None
+    summaries = [summary, {**summary, 'diff': -summary['diff']}]
+
+    def update():
+        # Alternate BUY and RENT so the recommendation colour changes as well
+        summaries.reverse()
+        gui._update_results(args, summaries[0])
+    return update
+
+
+def wall_time(args, repeat=5):
+    """Median wall time of running a fresh interpreter with args"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, stdout=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_time(module, repeat=5):
+    """Median wall time of a fresh interpreter importing module"""
+    return wall_time(['-c', f'import {module}'], repeat)
+
+
+class BenchmarkSuite:
+    """Latency, throughput, memory and import-time benchmarks.
+
+    Results are kept as {name: {'value', 'unit', 'higher_is_better'}} so they
+    can be saved to JSON and compared against a stored baseline.
+    """
+
+    def __init__(self, batch_size=1_000_000, quick=False):
+        self.batch_size = batch_size // 10 if quick else batch_size
+        self.repeat = 3 if quick else 5
+        self.results = {}
+
+    def record(self, name, value, unit, higher_is_better=False):
+        self.results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+    def run(self):
+        params = DEFAULT_SCENARIO
+        self.record('home_calculator_init', measure(lambda: HomeCalculator(**params), self.repeat), 's')
+        calculator = HomeCalculator(**params)
+        table = calculator.cost_table
+        self.record('total_buying_cost', measure(table.total_buying_cost, self.repeat), 's')
+        self.record('total_rent_paid', measure(table.total_rent_paid, self.repeat), 's')
+        self.record('total_investment_value', measure(table.total_investment_value, self.repeat), 's')
+        self.record('gui_update_results', measure(gui_update_benchmark(), self.repeat), 's')
+        # One input changes between evaluations; alternating two values makes every update recompute
+        incremental = IncrementalCalculator(**params)
+        rent_increases = itertools.cycle((params['rent_increase'], params['rent_increase'] + 0.5))
+        self.record('incremental_update_summary',
+                    measure(lambda: incremental.update(rent_increase=next(rent_increases)).summary(), self.repeat), 's')
+        self.record('incremental_update_columns',
+                    measure(lambda: incremental.update(rent_increase=next(rent_increases)).columns(), self.repeat), 's')
+
+        for years in HORIZONS:
+            cost_table_args = dict(
+                years=years, capital=params['capital'], monthly_mortgage=calculator.monthly_payment,
+                monthly_maintenance=params['monthly_maintenance'], rent=params['rent'],
+                rent_increase=params['rent_increase'],
+                alternative_investment_increase=params['alternative_investment_increase'],
+            )
+            self.record(f'cost_table_df_{years}y', measure(lambda: CostTable(**cost_table_args).df, self.repeat), 's')
+            self.record(f'home_calculator_summary_{years}y',
+                        measure(lambda: HomeCalculator(**{**params, 'years': years}).summary(), self.repeat), 's')
+
+            scenarios = random_scenarios(self.batch_size, years)
+            seconds = measure(lambda: BatchCalculator(**scenarios), self.repeat, min_time=0)
+            self.record(f'batch_throughput_{years}y', self.batch_size / seconds, 'scenarios/s', higher_is_better=True)
+
+        scenarios = random_scenarios(self.batch_size, 30)
+        self.record('batch_peak_memory', peak_memory(lambda: BatchCalculator(**scenarios)), 'bytes')
+        self.record('cost_table_df_peak_memory_40y', peak_memory(lambda: CostTable(**{**cost_table_args, 'years': 40}).df), 'bytes')
+        self.record('import_home_calculator', import_time('HomeCalculator', self.repeat), 's')
+        self.record('import_home_calculator_gui', import_time('HomeCalculatorGUI', self.repeat), 's')
+        # Startup plus one scenario, as when the CLI runs as a short-lived subprocess
+        self.record('cli_single_scenario', wall_time(['HomeCalculator.py'], self.repeat), 's')
+        return self.results
+
+    def save(self, path):
+        data = {
+            'metadata': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'numpy': np.__version__,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': self.results,
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def compare(self, baseline_path, threshold=0.2):
+        """Return (name, baseline, current, change) for every benchmark that regressed by more than threshold"""
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+        regressions = []
+        for name, result in self.results.items():
+            if name not in baseline:
+                continue
+            old, new = baseline[name]['value'], result['value']
+            if result['higher_is_better']:
+                change = old / new - 1 if new else float('inf')
+            else:
+                change = new / old - 1 if old else 0.0
+            if change > threshold:
+                regressions.append((name, old, new, change))
+        return regressions
+
+    def print_results(self):
+        print("\n" + "─"*70)
+        print("⏱️   BENCHMARK RESULTS")
+        print("─"*70)
+        for name, result in self.results.items():
+            value, unit = result['value'], result['unit']
+            if unit == 's' and value >= 1e-3:
+                text = f"{value * 1e3:>14,.2f} ms"
+            elif unit == 's':
+                text = f"{value * 1e6:>14,.2f} µs"
+            elif unit == 'bytes':
+                text = f"{value / 1e6:>14,.2f} MB"
+            else:
+                text = f"{value:>14,.0f} {unit}"
+            print(f"    {name:<36} {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Home Buying Calculator benchmarks')
+    parser.add_argument('--output', help='Save results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results stored in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that counts as a regression (default: 0.2 = 20%%)')
+    parser.add_argument('--quick', action='store_true', help='Smaller batches and fewer repeats')
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(quick=args.quick)
+    suite.run()
+    suite.print_results()
+    if args.output:
+        suite.save(args.output)
+    if args.baseline:
+        regressions = suite.compare(args.baseline, args.threshold)
+        if regressions:
+            print("\n❌  REGRESSIONS:")
+            for name, old, new, change in regressions:
+                print(f"    {name:<36} {old:.4g} -> {new:.4g} ({change:+.0%})")
+            sys.exit(1)
+        print(f"\n✅  No regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+
+from BatchCalculator import BatchCalculator
+from HomeCalculator import HomeCalculator
+
+# Parameters that can be solved for, with the default search bracket for each.
+# years is excluded since HomeCalculator truncates it to whole years.
+DEFAULT_BRACKETS = {
+    'capital': (0, 1e8),
+    'purchase_cost': (0, 1e8),
+    'monthly_maintenance': (0, 1e6),
+    'rent': (0, 1e6),
+    'rent_increase': (-50, 100),
+    'alternative_investment_increase': (-50, 100),
+    'property_value': (1, 1e9),
+    'property_value_increase': (-50, 100),
+    'interest_rate': (1e-6, 100),
+}
+
+
+def buy_rent_difference(**params):
+    """Property future value, less any balance still owed, minus the investment worth of renting (positive means BUY)"""
+    return HomeCalculator(**params).summary()['diff']
+
+
+def brent(f, a, b, xtol=1e-10, rtol=4 * np.finfo(float).eps, maxiter=100):
+    """Find a root of f in [a, b] with Brent's method; f(a) and f(b) must differ in sign.
+
+    Returns (root, number of evaluations).
+    """
+    fa, fb = f(a), f(b)
+    evaluations = 2
+    if fa == 0:
+        return a, evaluations
+    if fb == 0:
+        return b, evaluations
+    if np.sign(fa) == np.sign(fb):
+        raise ValueError(f"No sign change in [{a}, {b}]: f(a)={fa:,.2f}, f(b)={fb:,.2f}")
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(maxiter):
+        if np.sign(fb) == np.sign(fc):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * rtol * abs(b) + xtol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol or fb == 0:
+            return b, evaluations
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Try inverse quadratic interpolation (or the secant step with two points)
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = f(b)
+        evaluations += 1
+    raise RuntimeError(f"Brent's method did not converge in {maxiter} iterations")
+
+
+def find_break_even(parameter, bracket=None, xtol=1e-10, maxiter=100, **params):
+    """Find the value of one parameter at which buying and renting tie.
+
+    All other HomeCalculator parameters (including tranches) are passed as
+    keywords. Returns (value, number of evaluations).
+    """
+    if parameter not in DEFAULT_BRACKETS:
+        raise ValueError(f"Cannot solve for '{parameter}', expected one of {', '.join(DEFAULT_BRACKETS)}")
+    if parameter == 'interest_rate' and params.get('tranches'):
+        raise ValueError("Cannot solve for 'interest_rate' of a split mortgage, its tranches set the rates")
+    low, high = bracket or DEFAULT_BRACKETS[parameter]
+    params.pop(parameter, None)
+    return brent(lambda x: buy_rent_difference(**params, **{parameter: x}), low, high, xtol=xtol, maxiter=maxiter)
+
+
+def find_break_even_batch(parameter, bracket=None, xtol=1e-10, maxiter=100, **params):
+    """Solve the break-even value for many scenarios at once.
+
+    Parameters are broadcast arrays as for BatchCalculator. Every iteration
+    evaluates all unconverged scenarios in one vectorized call, using the
+    Illinois variant of regula falsi, which keeps the root bracketed, with a
+    bisection step whenever the interpolation leaves the bracket. Scenarios
+    without a sign change in the bracket come back as NaN.
+    """
+    if parameter not in DEFAULT_BRACKETS:
+        raise ValueError(f"Cannot solve for '{parameter}', expected one of {', '.join(DEFAULT_BRACKETS)}")
+    params.pop(parameter, None)
+    shape = np.broadcast_shapes(*[np.shape(value) for value in params.values()])
+    params = {name: np.broadcast_to(np.asarray(value, dtype=np.float64), shape).ravel() for name, value in params.items()}
+    low, high = bracket or DEFAULT_BRACKETS[parameter]
+    a = np.full(int(np.prod(shape)), float(low))
+    b = np.full_like(a, float(high))
+
+    def f(x, index):
+        subset = {name: value[index] for name, value in params.items()}
+        return BatchCalculator(**subset, **{parameter: x}).diff
+
+    everything = np.arange(len(a))
+    fa, fb = f(a, everything), f(b, everything)
+    root = np.full_like(a, np.nan)
+    active = np.sign(fa) != np.sign(fb)
+    root[fa == 0] = a[fa == 0]
+    root[fb == 0] = b[fb == 0]
+    active &= (fa != 0) & (fb != 0)
+
+    for _ in range(maxiter):
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            break
+        ai, bi, fai, fbi = a[index], b[index], fa[index], fb[index]
+        x = (ai * fbi - bi * fai) / (fbi - fai)
+        # Bisect when interpolation lands outside the bracket
+        outside = ~((x > np.minimum(ai, bi)) & (x < np.maximum(ai, bi)))
+        x[outside] = (ai[outside] + bi[outside]) / 2
+        fx = f(x, index)
+
+        same_as_b = np.sign(fx) == np.sign(fbi)
+        # x replaces the endpoint on its own side; when the other endpoint is kept
+        # again its value is halved so the interpolation cannot stall (Illinois step)
+        a[index] = np.where(same_as_b, ai, bi)
+        fa[index] = np.where(same_as_b, fai / 2, fbi)
+        b[index] = x
+        fb[index] = fx
+
+        converged = (np.abs(b[index] - a[index]) <= xtol + 4 * np.finfo(float).eps * np.abs(x)) | (fx == 0)
+        root[index[converged]] = x[converged]
+        active[index[converged]] = False
+    return root.reshape(shape)
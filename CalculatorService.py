@@ -0,0 +1,409 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from HomeCalculator import PARAMETERS
+from ResultCache import ResultCache
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+# Default limit of a request body in bytes
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def json_values(values):
+    """Result array as a list for JSON, with non-finite values (NaN, inf), which JSON lacks, as null"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    if np.isfinite(values).all():
+        return values.tolist()
+    output = values.astype(object)
+    output[~np.isfinite(values)] = None
+    return output.tolist()
+
+
+def evaluate_columns(columns):
+    """Evaluate columns of scenarios with BatchCalculator (runs in a worker process)"""
+    from BatchCalculator import BatchCalculator
+
+    return {name: json_values(values) for name, values in BatchCalculator(**columns).results().items()}
+
+
+def solve_break_even(parameter, bracket, params):
+    """Solve one break-even problem (runs in a worker process)"""
+    from BreakEvenSolver import find_break_even
+
+    value, evaluations = find_break_even(parameter, bracket=bracket, **params)
+    return {'parameter': parameter, 'value': json_values(value), 'evaluations': evaluations}
+
+
+def scenario_from_json(data):
+    """Validate one scenario object and return its parameters as floats"""
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Expected a JSON object of parameters")
+    missing = [name for name in PARAMETERS if name not in data]
+    if missing:
+        raise HTTPError(400, f"Missing parameters: {', '.join(missing)}")
+    try:
+        return {name: float(data[name]) for name in PARAMETERS}
+    except (TypeError, ValueError):
+        raise HTTPError(400, "Parameters must be numbers") from None
+
+
+def column_from_json(name, values):
+    """Validate one column of a /batch request: a number or a list of numbers, as floats"""
+    try:
+        if isinstance(values, list):
+            return [float(value) for value in values]
+        if isinstance(values, (int, float, str)):
+            return float(values)
+    except (TypeError, ValueError):
+        pass
+    raise HTTPError(400, f"Column '{name}' must be a number or a list of numbers")
+
+
+class Metrics:
+    """Request counters and latency histograms in the Prometheus text format"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = {}
+        self.latency_buckets = {}
+        self.latency_sum = {}
+        self.batches = 0
+        self.batched_requests = 0
+        self.scenarios = 0
+
+    def observe(self, endpoint, status, seconds):
+        key = (endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        buckets = self.latency_buckets.setdefault(endpoint, [0] * (len(LATENCY_BUCKETS) + 1))
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        buckets[-1] += 1
+        self.latency_sum[endpoint] = self.latency_sum.get(endpoint, 0.0) + seconds
+
+    def render(self):
+        lines = [
+            '# HELP calculator_requests_total HTTP requests by endpoint and status.',
+            '# TYPE calculator_requests_total counter',
+        ]
+        for (endpoint, status), count in sorted(self.requests.items()):
+            lines.append(f'calculator_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            '# HELP calculator_request_duration_seconds Request latency.',
+            '# TYPE calculator_request_duration_seconds histogram',
+        ]
+        for endpoint, buckets in sorted(self.latency_buckets.items()):
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f'calculator_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'calculator_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {buckets[-1]}')
+            lines.append(f'calculator_request_duration_seconds_sum{{endpoint="{endpoint}"}} {self.latency_sum[endpoint]}')
+            lines.append(f'calculator_request_duration_seconds_count{{endpoint="{endpoint}"}} {buckets[-1]}')
+        lines += [
+            '# HELP calculator_micro_batches_total Micro-batches evaluated for /calculate.',
+            '# TYPE calculator_micro_batches_total counter',
+            f'calculator_micro_batches_total {self.batches}',
+            '# HELP calculator_micro_batched_requests_total Requests answered through micro-batches.',
+            '# TYPE calculator_micro_batched_requests_total counter',
+            f'calculator_micro_batched_requests_total {self.batched_requests}',
+            '# HELP calculator_scenarios_total Scenarios evaluated.',
+            '# TYPE calculator_scenarios_total counter',
+            f'calculator_scenarios_total {self.scenarios}',
+            '# HELP calculator_uptime_seconds Seconds since the service started.',
+            '# TYPE calculator_uptime_seconds gauge',
+            f'calculator_uptime_seconds {time.time() - self.started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class MicroBatcher:
+    """Collect concurrent single-scenario requests into one vectorized evaluation.
+
+    A batch is evaluated when it reaches max_batch_size or max_wait seconds
+    after its first request, whichever comes first.
+    """
+
+    def __init__(self, evaluate, metrics, max_batch_size=1024, max_wait=0.002):
+        self.evaluate = evaluate
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks, so running batches are kept here
+        self._tasks = set()
+
+    async def submit(self, params):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((params, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        columns = {name: [params[name] for params, _ in batch] for name in PARAMETERS}
+        try:
+            results = await self.evaluate(columns)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.metrics.batches += 1
+        self.metrics.batched_requests += len(batch)
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result({name: values[i] for name, values in results.items()})
+
+
+class CalculatorService:
+    """Asyncio HTTP/JSON service around the batch calculator.
+
+    Endpoints:
+        POST /calculate  one scenario object -> result object (micro-batched)
+        POST /batch      {"scenarios": [...]} or columns {"years": [...], ...} -> result columns
+        POST /breakeven  {"parameter": ..., "bracket": [low, high], ...scenario} -> break-even value
+        GET  /metrics    Prometheus metrics
+        GET  /health     liveness check
+
+    CPU work runs in a process pool; with workers=0 it runs in the event loop.
+    Request bodies larger than max_body_size bytes are refused with 413.
+    /calculate results are kept in a ResultCache of cache_size entries (0
+    disables it), so repeated scenarios skip the batcher.
+    """
+
+    def __init__(self, workers=None, max_batch_size=1024, max_wait=0.002, max_body_size=MAX_BODY_SIZE,
+                 cache_size=4096, cache_ttl=None, cache_path=None):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.max_body_size = max_body_size
+        self.cache = ResultCache(cache_size, ttl=cache_ttl, path=cache_path) if cache_size else None
+        self.executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+        self.metrics = Metrics()
+        self.batcher = MicroBatcher(self.evaluate, self.metrics, max_batch_size, max_wait)
+        self.routes = {
+            ('POST', '/calculate'): self.calculate,
+            ('POST', '/batch'): self.batch,
+            ('POST', '/breakeven'): self.breakeven,
+            ('GET', '/metrics'): self.render_metrics,
+            ('GET', '/health'): self.health,
+        }
+
+    async def run_cpu(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def evaluate(self, columns):
+        self.metrics.scenarios += max((len(values) for values in columns.values() if isinstance(values, list)), default=1)
+        return await self.run_cpu(evaluate_columns, columns)
+
+    async def calculate(self, body):
+        params = scenario_from_json(body)
+        if self.cache is None:
+            return await self.batcher.submit(params)
+        result = self.cache.get(params)
+        if result is None:
+            result = await self.batcher.submit(params)
+            self.cache.put(params, result)
+        return result
+
+    async def batch(self, body):
+        if isinstance(body, dict) and 'scenarios' in body:
+            if not isinstance(body['scenarios'], list):
+                raise HTTPError(400, "Expected 'scenarios' as a list of scenario objects")
+            scenarios = [scenario_from_json(item) for item in body['scenarios']]
+            columns = {name: [scenario[name] for scenario in scenarios] for name in PARAMETERS}
+        else:
+            columns = body
+            if not isinstance(columns, dict) or any(name not in columns for name in PARAMETERS):
+                raise HTTPError(400, f"Expected 'scenarios' or a column for each of: {', '.join(PARAMETERS)}")
+            columns = {name: column_from_json(name, columns[name]) for name in PARAMETERS}
+            lengths = {len(values) for values in columns.values() if isinstance(values, list)}
+            if len(lengths) > 1:
+                raise HTTPError(400, "All columns must have the same length")
+        try:
+            return await self.evaluate(columns)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+
+    async def breakeven(self, body):
+        from BreakEvenSolver import DEFAULT_BRACKETS
+
+        if not isinstance(body, dict) or 'parameter' not in body:
+            raise HTTPError(400, "Expected a 'parameter' to solve for")
+        parameter = body['parameter']
+        if not isinstance(parameter, str) or parameter not in DEFAULT_BRACKETS:
+            raise HTTPError(400, f"Cannot solve for {json.dumps(parameter)}, expected one of {', '.join(DEFAULT_BRACKETS)}")
+        bracket = body.get('bracket')
+        if bracket is not None:
+            if not isinstance(bracket, list) or len(bracket) != 2:
+                raise HTTPError(400, "Expected 'bracket' as [low, high]")
+            try:
+                bracket = [float(value) for value in bracket]
+            except (TypeError, ValueError):
+                raise HTTPError(400, "Bracket bounds must be numbers") from None
+        params = scenario_from_json({parameter: 0, **body})
+        del params[parameter]
+        try:
+            return await self.run_cpu(solve_break_even, parameter, bracket, params)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+
+    async def render_metrics(self, body):
+        text = self.metrics.render()
+        if self.cache is None:
+            return text
+        stats = self.cache.stats()
+        return text + '\n'.join([
+            '# HELP calculator_cache_hits_total /calculate requests answered from the result cache.',
+            '# TYPE calculator_cache_hits_total counter',
+            f'calculator_cache_hits_total {stats["hits"]}',
+            '# HELP calculator_cache_misses_total /calculate requests that were evaluated.',
+            '# TYPE calculator_cache_misses_total counter',
+            f'calculator_cache_misses_total {stats["misses"]}',
+            '# HELP calculator_cache_entries Entries in the result cache.',
+            '# TYPE calculator_cache_entries gauge',
+            f'calculator_cache_entries {stats["size"]}',
+        ]) + '\n'
+
+    async def health(self, body):
+        return {'status': 'ok'}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive between requests"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+
+                start = time.perf_counter()
+                path = path.split('?', 1)[0]
+                if length > self.max_body_size:
+                    # The body is left unread, so the connection cannot carry another request
+                    status, payload = 413, {'error': f"Request body exceeds {self.max_body_size} bytes"}
+                    headers['connection'] = 'close'
+                else:
+                    raw_body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method, path, raw_body)
+                # Unknown paths share one label to keep the metrics bounded
+                endpoint = path if any(route_path == path for _, route_path in self.routes) else 'other'
+                self.metrics.observe(endpoint, status, time.perf_counter() - start)
+
+                if isinstance(payload, str):
+                    content, content_type = payload.encode(), 'text/plain; version=0.0.4'
+                else:
+                    content, content_type = json.dumps(payload).encode(), 'application/json'
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, raw_body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            known_path = any(route_path == path for _, route_path in self.routes)
+            return (405, {'error': 'Method not allowed'}) if known_path else (404, {'error': 'Not found'})
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except json.JSONDecodeError:
+            return 400, {'error': 'Invalid JSON'}
+        try:
+            return 200, await handler(body)
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🏠  Calculator service listening on http://{host}:{port} ({self.workers} worker processes)")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Home Buying Calculator HTTP/JSON service')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes for CPU work (0 evaluates in the event loop)')
+    parser.add_argument('--max-batch-size', type=int, default=1024,
+                        help='Largest micro-batch of /calculate requests')
+    parser.add_argument('--max-wait-ms', type=float, default=2,
+                        help='Longest time a /calculate request waits for its micro-batch to fill')
+    parser.add_argument('--max-body-size', type=int, default=MAX_BODY_SIZE,
+                        help='Largest request body in bytes; larger requests are refused with 413')
+    parser.add_argument('--cache-size', type=int, default=4096,
+                        help='Number of /calculate results to cache (0 disables the cache)')
+    parser.add_argument('--cache-ttl', type=float,
+                        help='Seconds a cached result stays valid (default: until evicted)')
+    parser.add_argument('--cache-path',
+                        help='SQLite file that keeps cached results across restarts')
+    args = parser.parse_args()
+
+    service = CalculatorService(args.workers, args.max_batch_size, args.max_wait_ms / 1000, args.max_body_size,
+                                args.cache_size, args.cache_ttl, args.cache_path)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import numpy as np
+
+from AmortizationSchedule import AmortizationSchedule
+from BatchCalculator import PARAMETERS
+
+
+class CashFlowEngine:
+    """Month-by-month net worth of a buying and a renting household.
+
+    Both households spend the same each month: the larger of the buyer's
+    costs (payment until the loan is repaid, plus maintenance) and the rent.
+    Whoever spends less invests the surplus at the alternative investment
+    rate, so in months where rent exceeds the buyer's costs the buyer builds
+    a portfolio too. At month 0 the buyer spends the capital on the purchase
+    and the renter invests it.
+
+    The net worth after a sale at month m is the buyer's portfolio plus the
+    appreciated value less `selling_cost` (% of the price) and the remaining
+    balance, against the renter's portfolio. Optional taxes apply on
+    liquidation: `capital_gains_tax` (%) on portfolio gains over the
+    contributions and `property_gains_tax` (%) on the net sale price over the
+    price plus purchase costs. Without taxes the difference equals the
+    CostTable/BatchCalculator result at the end of the term.
+
+    Every portfolio is one cumulative sum of discounted contributions, so the
+    cost is O(months) array operations for any number of scenarios. Inputs
+    broadcast like BatchCalculator; scenarios go along the first axis and
+    months along the last. Months past a scenario's holding period are NaN.
+    """
+
+    COLUMNS = (
+        'buying_cost', 'renting_cost', 'balance', 'home_value', 'sale_proceeds', 'buyer_portfolio',
+        'renter_portfolio', 'investment', 'buyer_net_worth', 'renter_net_worth', 'diff',
+    )
+
+    def __init__(
+        self,
+        years,
+        capital,
+        purchase_cost,
+        monthly_maintenance,
+        rent,
+        rent_increase,
+        alternative_investment_increase,
+        property_value,
+        property_value_increase,
+        interest_rate,
+        holding_years=None,
+        selling_cost=0,
+        capital_gains_tax=0,
+        property_gains_tax=0,
+    ):
+        params = dict(zip(PARAMETERS, (
+            years, capital, purchase_cost, monthly_maintenance, rent, rent_increase,
+            alternative_investment_increase, property_value, property_value_increase, interest_rate,
+        )))
+        params['holding_years'] = years if holding_years is None else holding_years
+        params['selling_cost'] = selling_cost
+        params['capital_gains_tax'] = capital_gains_tax
+        params['property_gains_tax'] = property_gains_tax
+        arrays = np.broadcast_arrays(*[np.asarray(value, dtype=np.float64) for value in params.values()])
+        scalar = arrays[0].ndim == 0
+        p = {name: array.reshape(-1, 1) for name, array in zip(params, arrays)}
+
+        holding_months = np.trunc(p['holding_years'] * 12)
+        if (holding_months < 1).any():
+            raise ValueError("holding_years must be at least one month")
+        loan_amount = p['property_value'] + p['purchase_cost'] - p['capital']
+        term = np.trunc(p['years']) * 12
+        month = np.arange(int(holding_months.max()) + 1, dtype=np.float64)
+        balance, payment = AmortizationSchedule.balance_and_payment(loan_amount, p['interest_rate'], term, month)
+
+        # Monthly cash flows: the capital up front, then payments (until the loan is
+        # repaid) plus maintenance against rent that steps once a year
+        buying_cost = np.where(month <= term, payment + p['monthly_maintenance'], p['monthly_maintenance'])
+        buying_cost[:, 0] = p['capital'][:, 0]
+        rent_years = int(np.ceil(month[-1] / 12))
+        yearly_rent = p['rent'] * (1 + p['rent_increase'] / 100) ** np.arange(rent_years, dtype=np.float64)
+        renting_cost = np.zeros_like(buying_cost)
+        renting_cost[:, 1:] = np.repeat(yearly_rent, 12, axis=1)[:, :len(month) - 1]
+
+        surplus = buying_cost - renting_cost
+        buyer_contribution = np.maximum(-surplus, 0)
+        renter_contribution = np.maximum(surplus, 0)
+
+        # Portfolio at month m: sum_k c_k q^(m-k) = cumsum(c_k q^-k) / q^-m
+        log_q = np.log1p(p['alternative_investment_increase'] / 100) / 12
+        discount = np.exp(-month * log_q)
+        buyer_portfolio = np.cumsum(buyer_contribution * discount, axis=1) / discount
+        renter_portfolio = np.cumsum(renter_contribution * discount, axis=1) / discount
+
+        home_value = p['property_value'] * (1 + p['property_value_increase'] / 100) ** (month / 12)
+        sale_price = home_value * (1 - p['selling_cost'] / 100)
+        sale_proceeds = sale_price - balance
+        buyer_net_worth = sale_proceeds + buyer_portfolio
+        renter_net_worth = renter_portfolio.copy()
+        if (p['capital_gains_tax'] != 0).any():
+            rate = p['capital_gains_tax'] / 100
+            buyer_net_worth -= rate * np.maximum(buyer_portfolio - np.cumsum(buyer_contribution, axis=1), 0)
+            renter_net_worth -= rate * np.maximum(renter_portfolio - np.cumsum(renter_contribution, axis=1), 0)
+        if (p['property_gains_tax'] != 0).any():
+            gain = sale_price - p['property_value'] - p['purchase_cost']
+            property_tax = p['property_gains_tax'] / 100 * np.maximum(gain, 0)
+            sale_proceeds -= property_tax
+            buyer_net_worth -= property_tax
+
+        diff = buyer_net_worth - renter_net_worth
+        beyond = month > holding_months
+        for array in (buyer_portfolio, renter_portfolio, sale_proceeds, buyer_net_worth, renter_net_worth, diff):
+            array[beyond] = np.nan
+
+        self.month = month
+        self.buying_cost = buying_cost
+        self.renting_cost = renting_cost
+        self.balance = balance
+        self.home_value = home_value
+        self.sale_proceeds = sale_proceeds
+        self.buyer_portfolio = buyer_portfolio
+        self.renter_portfolio = renter_portfolio
+        # Renter minus buyer portfolio before tax: the running CostTable investment value
+        self.investment = renter_portfolio - buyer_portfolio
+        self.buyer_net_worth = buyer_net_worth
+        self.renter_net_worth = renter_net_worth
+        self.diff = diff
+        # Selling in month 0 is not an exit, so the search starts at month 1
+        self.best_month = np.nanargmax(diff[:, 1:], axis=1) + 1
+        self.best_diff = diff[np.arange(len(diff)), self.best_month]
+
+        if scalar:
+            for name in self.COLUMNS:
+                setattr(self, name, getattr(self, name)[0])
+            self.best_month = int(self.best_month[0])
+            self.best_diff = float(self.best_diff[0])
+
+    def columns(self):
+        """Return the monthly columns keyed by name"""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def curve(self, step=1):
+        """The buy-minus-rent curve as (months, diff), e.g. step=12 for yearly exits"""
+        return self.month[::step], self.diff[..., ::step]
+
+
+if __name__ == "__main__":
+    import time
+
+    scenario = dict(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200, rent=4200,
+                    rent_increase=3, alternative_investment_increase=7, property_value=1600000,
+                    property_value_increase=4.5, interest_rate=5)
+    for tax in (0, 25):
+        engine = CashFlowEngine(**scenario, holding_years=40, capital_gains_tax=tax)
+        print(f"Capital gains tax {tax}%: buyer {engine.buyer_net_worth[-1]:,.2f}, "
+              f"renter {engine.renter_net_worth[-1]:,.2f}, difference {engine.diff[-1]:,.2f}")
+
+    rng = np.random.default_rng(0)
+    size = 10_000
+    start = time.perf_counter()
+    CashFlowEngine(**dict(scenario, rent=rng.uniform(3000, 9000, size)), capital_gains_tax=25)
+    print(f"{size:,} scenarios x 360 months in {time.perf_counter() - start:.3f}s")
@@ -1,19 +1,121 @@
-import pandas as pd
+import math
+
+from Profiler import instrument, stage
+
+# Display names used by print_df
+COLUMN_LABELS = {
+    'buying_cost': '🏠 Buying Cost',
+    'renting_cost': '🏠 Renting Cost',
+    'diff': '💰 Difference',
+    'investment': '📈 Investment Value',
+    'payment': '💳 Payment',
+    'interest': '💸 Interest',
+    'principal': '🏦 Principal',
+    'balance': '🏦 Balance',
+    'equity': '🏠 Equity',
+    'real_buying_cost': '💵 Real Buying Cost',
+    'real_renting_cost': '💵 Real Renting Cost',
+    'present_value': '💵 Present Value',
+}
 
 class CostTable:
-    def __init__(self, years, capital, monthly_mortgage, monthly_maintenance, rent, rent_increase, alternative_investment_increase):
+    @instrument('CostTable.__init__')
+    def __init__(self, years, capital, monthly_mortgage, monthly_maintenance, rent, rent_increase, alternative_investment_increase,
+                 loan_amount=None, interest_rate=None, property_value=None, property_value_increase=0, mortgage=None,
+                 inflation=None):
         # Convert years to integer to avoid float/integer conversion issues
         self.years = int(years)
+        self.capital = capital
+        self.monthly_mortgage = monthly_mortgage
+        self.monthly_maintenance = monthly_maintenance
         self.base_rent = rent
         self.rent_increase = rent_increase / 100
-        self.df = pd.DataFrame({
-            'buying_cost': [capital] + [(monthly_mortgage + monthly_maintenance) for i in range(1, self.years*12 + 1)],
-            'renting_cost': [self.calculate_rent(i) for i in range(0, self.years*12 + 1)],
-        }, index=[i for i in range(0, self.years*12 + 1)])
-        self.df.index.name = 'month'
-        self.df['diff'] = self.df['buying_cost'] - self.df['renting_cost']
-        self.df['investment'] = self.df['diff'] * ((1 + alternative_investment_increase / 100) ** (1/12)) ** (self.years*12 - self.df.index)
+        self.alternative_investment_increase = alternative_investment_increase / 100
+        # Optional loan details add the amortization columns to the table
+        self.loan_amount = loan_amount
+        self.interest_rate = interest_rate
+        self.property_value = property_value
+        self.property_value_increase = property_value_increase
+        # A MortgageModel replaces the fixed monthly payment with its schedule
+        self.mortgage = mortgage
+        self._mortgage_totals = None
+        # An annual inflation (discount) rate in % adds figures in today's money
+        self.inflation = None if inflation is None else inflation / 100
+        # The monthly table is only built when someone asks for the rows
+        self._df = None
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = self.build_df()
+        return self._df
+
+    @instrument('CostTable.build_df')
+    def build_df(self):
+        """Build the month-by-month cost table"""
+        # NumPy and pandas are only needed for the rows; the totals are pure Python
+        with stage('import numpy/pandas'):
+            import numpy as np
+            import pandas as pd
+
+        months = self.years * 12 + 1
+        buying_cost = np.full(months, self.monthly_mortgage + self.monthly_maintenance, dtype=np.float64)
+        if self.mortgage is not None:
+            buying_cost[1:] = self._fit(self.mortgage.payment, months)[1:] + self.monthly_maintenance
+        buying_cost[0] = self.capital
+        # Rent is constant within a year, so compute one value per year and repeat it
+        renting_cost = np.empty(months, dtype=np.float64)
+        renting_cost[0] = 0
+        yearly_rent = self.base_rent * (1 + self.rent_increase) ** np.arange(self.years, dtype=np.float64)
+        renting_cost[1:] = np.repeat(yearly_rent, 12)
+        diff = buying_cost - renting_cost
+        # Months left to the end of the horizon, shared by the compounding and the discounting
+        remaining = np.arange(months - 1, -1, -1, dtype=np.float64)
+        with stage('investment column'):
+            investment = diff * ((1 + self.alternative_investment_increase) ** (1/12)) ** remaining
+        columns = {
+            'buying_cost': buying_cost,
+            'renting_cost': renting_cost,
+            'diff': diff,
+            'investment': investment,
+        }
+        if self.inflation is not None:
+            with stage('real columns'):
+                # (1 + inflation) ** (-month / 12): today's value of a payment made in that month
+                deflator = ((1 + self.inflation) ** (1/12)) ** (remaining - remaining[0])
+                columns['real_buying_cost'] = buying_cost * deflator
+                columns['real_renting_cost'] = renting_cost * deflator
+                columns['present_value'] = diff * deflator
+        if self.loan_amount is not None or self.mortgage is not None:
+            with stage('amortization columns'):
+                columns.update({name: self._fit(column, months) for name, column in self.amortization().columns().items()})
+        with stage('DataFrame'):
+            return pd.DataFrame(columns, index=pd.RangeIndex(months, name='month'), copy=False)
+
+    @staticmethod
+    def _fit(column, months):
+        """Truncate a schedule column to the table, or extend it with its last value"""
+        import numpy as np
 
+        if len(column) >= months:
+            return column[:months]
+        return np.concatenate([column, np.full(months - len(column), column[-1] if len(column) else 0.0)])
+
+    def amortization(self):
+        """Return the loan's MortgageModel if given, else its AmortizationSchedule (requires loan_amount and interest_rate)"""
+        if self.mortgage is not None:
+            return self.mortgage
+        if self.loan_amount is None or self.interest_rate is None:
+            raise ValueError("CostTable was created without loan_amount and interest_rate")
+        from AmortizationSchedule import AmortizationSchedule
+
+        return AmortizationSchedule(
+            self.loan_amount,
+            self.interest_rate,
+            self.years,
+            property_value=self.property_value,
+            property_value_increase=self.property_value_increase,
+        )
 
     def calculate_rent(self, month):
         # Calculate the rent for the given month
@@ -22,8 +124,11 @@ class CostTable:
         year = int((month-1) // 12)  # Ensure year is an integer
         return self.base_rent * (1 + self.rent_increase) ** year
     
+    @instrument('CostTable.print_df')
     def print_df(self):
         """Print the cost table with beautiful formatting"""
+        import pandas as pd
+
         print("\n" + "─"*80)
         print("📊  DETAILED MONTHLY COST BREAKDOWN")
         print("─"*80)
@@ -32,7 +137,7 @@ class CostTable:
         with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.float_format', '{:,.2f}'.format):
             # Rename columns for better display
             display_df = self.df.copy()
-            display_df.columns = ['🏠 Buying Cost', '🏠 Renting Cost', '💰 Difference', '📈 Investment Value']
+            display_df.columns = [COLUMN_LABELS[name] for name in display_df.columns]
             display_df.index.name = '📅 Month'
             
             print(display_df)
@@ -46,13 +151,95 @@ class CostTable:
         print(f"💡  Net Difference:        ${self.total_investment_value() - self.total_rent_paid():>15,.2f}")
 
     def total_rent_paid(self):
-        return self.df['renting_cost'].sum()
-    
+        # Rent steps once a year, so the total is a geometric series over the years
+        return self.base_rent * 12 * self.yearly_growth_sum(self.rent_increase, self.years)
+
+    def mortgage_totals(self):
+        """Payments over the horizon, their compounded value at its end and the balance still owed then"""
+        if self.mortgage is None:
+            total = self.monthly_mortgage * self.years * 12
+            return total, self.monthly_mortgage * self.growth_factors(self.alternative_investment_increase, self.years)[1], 0.0
+        if self._mortgage_totals is None:
+            self._mortgage_totals = self.mortgage.totals(self.years, self.alternative_investment_increase * 100)
+        return self._mortgage_totals
+
+    def total_mortgage_payments(self):
+        return self.mortgage_totals()[0]
+
+    def remaining_balance(self):
+        """Balance still owed at the end of the horizon (only a mortgage longer than years leaves one)"""
+        if self.mortgage is None:
+            return 0.0
+        return self.mortgage_totals()[2]
+
     def total_buying_cost(self):
-        return self.df['buying_cost'].sum()
+        if self.mortgage is not None:
+            return self.capital + self.total_mortgage_payments() + self.monthly_maintenance * self.years * 12
+        return self.capital + (self.monthly_mortgage + self.monthly_maintenance) * self.years * 12
 
+    @instrument('CostTable.total_investment_value')
     def total_investment_value(self):
-        return self.df['investment'].sum()
+        # Every monthly difference compounds to the end of the horizon, so the sum splits
+        # into the compounded capital, a geometric series of the fixed buying cost and a
+        # year-by-year series of the rent
+        growth, months_factor, year_factor = self.growth_factors(self.alternative_investment_increase, self.years)
+        rent_factor = self.rent_factor(self.alternative_investment_increase, self.rent_increase, self.years)
+        if self.mortgage is not None:
+            buying_value = self.monthly_maintenance * months_factor + self.mortgage_totals()[1]
+        else:
+            buying_value = (self.monthly_mortgage + self.monthly_maintenance) * months_factor
+        return self.capital * growth + buying_value - self.base_rent * year_factor * rent_factor
+
+    def deflator(self):
+        """Today's value of one unit at the end of the horizon (1 without inflation)"""
+        if self.inflation is None:
+            return 1.0
+        return (1 + self.inflation) ** -self.years
+
+    def real_total_buying_cost(self):
+        """Present value of the buying costs, discounted month by month at the inflation rate"""
+        # A stream compounded to the horizon at the inflation rate and deflated back
+        inflation = self.inflation or 0.0
+        months_factor = self.growth_factors(inflation, self.years)[1]
+        if self.mortgage is not None:
+            payments = self.mortgage.totals(self.years, inflation * 100)[1]
+            return self.capital + (self.monthly_maintenance * months_factor + payments) * self.deflator()
+        return self.capital + (self.monthly_mortgage + self.monthly_maintenance) * months_factor * self.deflator()
+
+    def real_total_rent_paid(self):
+        """Present value of the rent, discounted month by month at the inflation rate"""
+        inflation = self.inflation or 0.0
+        year_factor = self.growth_factors(inflation, self.years)[2]
+        return self.base_rent * year_factor * self.rent_factor(inflation, self.rent_increase, self.years) * self.deflator()
+
+    def real_total_investment_value(self):
+        return self.total_investment_value() * self.deflator()
+
+    @staticmethod
+    def growth_factors(a, years):
+        """Growth of the capital, and compounded value of 1 paid every month and of 1 paid every year"""
+        growth = (1 + a) ** years
+        if a == 0:
+            return growth, years * 12, 12
+        monthly_rate = math.expm1(math.log1p(a) / 12)
+        return growth, math.expm1(years * math.log1p(a)) / monthly_rate, a / monthly_rate
+
+    @staticmethod
+    def rent_factor(a, g, years):
+        """Sum over y of (1 + g) ** y * (1 + a) ** (years - 1 - y)"""
+        # (1 + a) ** (years - 1) times the geometric series in (1 + g) / (1 + a) = exp(d),
+        # summed with expm1 so that close rates do not cancel as in (1+a)^n - (1+g)^n over a - g
+        d = math.log1p(g) - math.log1p(a)
+        if d == 0:
+            return years * (1 + a) ** (years - 1)
+        return (1 + a) ** (years - 1) * math.expm1(years * d) / math.expm1(d)
+
+    @staticmethod
+    def yearly_growth_sum(rate, years):
+        """Sum of (1 + rate) ** y for y in range(years)"""
+        if rate == 0:
+            return years
+        return math.expm1(years * math.log1p(rate)) / rate
     
 
 
@@ -0,0 +1,157 @@
+from bisect import bisect_left
+from itertools import product
+import json
+import struct
+
+import numpy as np
+
+from BatchCalculator import PARAMETERS, REAL_RESULTS, RESULTS
+
+MAGIC = b'HBCGRID1'
+# Data starts on a page boundary so that the memory map is page aligned
+ALIGNMENT = 4096
+
+
+class GridStore:
+    """Precomputed results of a parameter grid in a memory-mapped binary file.
+
+    Layout: the 8 byte magic, the header length as a little-endian uint64, a
+    JSON header with the axis values of all ten parameters and the result
+    names, zero padding to a 4096 byte boundary, then the results as a C-order
+    little-endian float64 array of shape (*axis lengths, number of results).
+    A grid created with an inflation rate also stores the REAL_RESULTS.
+
+    The file is opened read-only with numpy.memmap, so any number of processes
+    share the same pages. nearest() snaps a query to the closest grid point
+    (O(1) on evenly spaced axes) and interpolate() is multilinear between the
+    surrounding grid points. Queries outside the grid are clamped to its edges.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{path}' is not a grid store")
+            (length,) = struct.unpack('<Q', handle.read(8))
+            header = json.loads(handle.read(length))
+        self.axes = {name: np.asarray(header['axes'][name], dtype=np.float64) for name in PARAMETERS}
+        unsorted = [name for name, axis in self.axes.items() if np.any(np.diff(axis) <= 0)]
+        if unsorted:
+            raise ValueError(f"'{path}' has axes that are not strictly increasing: {', '.join(unsorted)}")
+        self.results = tuple(header['results'])
+        self.shape = tuple(len(self.axes[name]) for name in PARAMETERS)
+        self.values = np.memmap(path, dtype='<f8', mode='r', offset=header['offset'],
+                                shape=self.shape + (len(self.results),))
+        # Evenly spaced axes are indexed arithmetically, the others by binary search
+        self._steps = {}
+        for name, axis in self.axes.items():
+            steps = np.diff(axis)
+            if len(axis) > 1 and np.allclose(steps, steps[0], rtol=1e-9, atol=0):
+                self._steps[name] = (axis[-1] - axis[0]) / (len(axis) - 1)
+        self._axis_lists = {name: axis.tolist() for name, axis in self.axes.items()}
+
+    @classmethod
+    def create(cls, path, axes, workers=1, chunk_size=100_000, inflation=None):
+        """Evaluate the Cartesian product of the axes and write it to path
+
+        Axis values may come in any order (e.g. from the command line); they are
+        stored sorted and without duplicates, as the lookups require.
+        """
+        from ParameterSweep import ParameterSweep
+
+        axes = {name: np.unique(np.asarray(axes[name], dtype=np.float64)) for name in PARAMETERS}
+        sweep = ParameterSweep(axes, workers=workers, chunk_size=chunk_size, inflation=inflation)
+        results = RESULTS if inflation is None else RESULTS + REAL_RESULTS
+        header = {'axes': {name: sweep.axes[name].tolist() for name in PARAMETERS}, 'results': list(results)}
+        # The offset is part of the header, so size the header with a placeholder first
+        header['offset'] = 0
+        length = len(json.dumps(header)) + 32
+        header['offset'] = -(-(len(MAGIC) + 8 + length) // ALIGNMENT) * ALIGNMENT
+        encoded = json.dumps(header).encode().ljust(length)
+        with open(path, 'wb') as handle:
+            handle.write(MAGIC + struct.pack('<Q', length) + encoded)
+            handle.write(b'\0' * (header['offset'] - handle.tell()))
+
+        values = np.memmap(path, dtype='<f8', mode='r+', offset=header['offset'], shape=(sweep.size, len(results)))
+        for (start, stop), columns in zip(sweep.chunks(), sweep.results()):
+            for i, name in enumerate(results):
+                values[start:stop, i] = columns[name]
+        values.flush()
+        del values
+        return cls(path)
+
+    def _position(self, name, value):
+        """Fractional index of value on an axis, clamped to the axis"""
+        axis = self.axes[name]
+        if len(axis) == 1:
+            return np.zeros_like(value)
+        if name in self._steps:
+            position = (value - axis[0]) / self._steps[name]
+        else:
+            upper = np.clip(np.searchsorted(axis, value), 1, len(axis) - 1)
+            lower = upper - 1
+            position = lower + (value - axis[lower]) / (axis[upper] - axis[lower])
+        return np.clip(position, 0, len(axis) - 1)
+
+    def _positions(self, params):
+        unknown = set(params) - set(PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+        positions = []
+        for name in PARAMETERS:
+            if name in params:
+                positions.append(self._position(name, np.asarray(params[name], dtype=np.float64)))
+            elif len(self.axes[name]) == 1:
+                positions.append(np.zeros(()))
+            else:
+                raise ValueError(f"Missing parameter '{name}', the grid has {len(self.axes[name])} values for it")
+        return np.broadcast_arrays(*positions)
+
+    def _columns(self, values):
+        return {name: values[..., i] for i, name in enumerate(self.results)}
+
+    def _nearest_index(self, name, value):
+        """Index of the grid value closest to a scalar value, without NumPy overhead"""
+        axis = self._axis_lists[name]
+        if len(axis) == 1:
+            return 0
+        if name in self._steps:
+            index = round((value - axis[0]) / self._steps[name])
+        else:
+            index = bisect_left(axis, value)
+            if 0 < index < len(axis) and value - axis[index - 1] <= axis[index] - value:
+                index -= 1
+        return min(max(index, 0), len(axis) - 1)
+
+    def nearest(self, **params):
+        """Results at the grid point closest to the given parameters (floats for scalar queries)"""
+        scalar = all(isinstance(value, (int, float)) for value in params.values())
+        if scalar and set(params) <= set(PARAMETERS) and all(
+                name in params or len(self._axis_lists[name]) == 1 for name in PARAMETERS):
+            row = self.values[tuple(self._nearest_index(name, params.get(name, 0)) for name in PARAMETERS)]
+            return dict(zip(self.results, row.tolist()))
+        index = tuple(np.rint(position).astype(np.intp) for position in self._positions(params))
+        return self._columns(self.values[index])
+
+    def interpolate(self, **params):
+        """Results interpolated linearly along every axis between the surrounding grid points"""
+        positions = self._positions(params)
+        lower, weight, varying = [], [], []
+        for name, position in zip(PARAMETERS, positions):
+            low = np.minimum(np.floor(position).astype(np.intp), len(self.axes[name]) - 2)
+            low = np.maximum(low, 0)
+            lower.append(low)
+            weight.append(position - low)
+            varying.append(len(self.axes[name]) > 1)
+
+        dimensions = [i for i, flag in enumerate(varying) if flag]
+        total = 0.0
+        # Sum over the 2^d corners of the enclosing cell, d being the number of varying axes
+        for corner in product((0, 1), repeat=len(dimensions)):
+            index = list(lower)
+            corner_weight = 1.0
+            for dimension, step in zip(dimensions, corner):
+                index[dimension] = lower[dimension] + step
+                corner_weight = corner_weight * (weight[dimension] if step else 1 - weight[dimension])
+            total = total + np.asarray(corner_weight)[..., np.newaxis] * self.values[tuple(index)]
+        return self._columns(np.asarray(total))
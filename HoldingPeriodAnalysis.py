@@ -0,0 +1,79 @@
+import numpy as np
+
+from CashFlowEngine import CashFlowEngine
+
+
+class HoldingPeriodAnalysis(CashFlowEngine):
+    """Buy-minus-rent outcome for selling the property at every month.
+
+    `years` is the mortgage term; the property can be sold at any month up to
+    `holding_years` (by default the term), which may be shorter or longer than
+    the term. Selling at month m leaves the buyer with the appreciated value
+    less `selling_cost` (% of the sale price) and the remaining balance, while
+    the renter holds every monthly difference invested up to month m. After
+    the loan is repaid the buyer only pays maintenance.
+
+    This is the CashFlowEngine without taxes; `best_month` and `best_diff`
+    give the optimal exit and `curve()` the whole buy-minus-rent curve.
+    """
+
+    def __init__(
+        self,
+        years,
+        capital,
+        purchase_cost,
+        monthly_maintenance,
+        rent,
+        rent_increase,
+        alternative_investment_increase,
+        property_value,
+        property_value_increase,
+        interest_rate,
+        holding_years=None,
+        selling_cost=0,
+    ):
+        super().__init__(
+            years, capital, purchase_cost, monthly_maintenance, rent, rent_increase,
+            alternative_investment_increase, property_value, property_value_increase, interest_rate,
+            holding_years=holding_years, selling_cost=selling_cost,
+        )
+
+
+def optimal_exits(chunk_size=10_000, **params):
+    """Best exit month and its buy-minus-rent for many scenarios.
+
+    Takes the CashFlowEngine parameters (including the optional taxes).
+    Scenarios are analysed chunk by chunk so that memory stays bounded for
+    hundreds of thousands of listings; only the optima are kept.
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(value, dtype=np.float64) for value in params.values()])
+    shape = arrays[0].shape
+    flat = {name: array.reshape(-1) for name, array in zip(params, arrays)}
+    size = int(np.prod(shape))
+    best_month = np.empty(size, dtype=np.int64)
+    best_diff = np.empty(size)
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        analysis = CashFlowEngine(**{name: array[start:stop] for name, array in flat.items()})
+        best_month[start:stop] = analysis.best_month
+        best_diff[start:stop] = analysis.best_diff
+    return best_month.reshape(shape), best_diff.reshape(shape)
+
+
+if __name__ == "__main__":
+    import time
+
+    scenario = dict(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200, rent=4200,
+                    rent_increase=3, alternative_investment_increase=7, property_value=1600000,
+                    property_value_increase=4.5, interest_rate=5)
+    analysis = HoldingPeriodAnalysis(**scenario, holding_years=40, selling_cost=5)
+    for month, diff in zip(*analysis.curve(step=60)):
+        print(f"Sell after {month / 12:>4.0f} years: {diff:>16,.2f}")
+    print(f"Best exit: month {analysis.best_month} ({analysis.best_month / 12:.1f} years), {analysis.best_diff:,.2f}")
+
+    rng = np.random.default_rng(0)
+    size = 200_000
+    start = time.perf_counter()
+    optimal_exits(**dict(scenario, rent=rng.uniform(3000, 6000, size), property_value=rng.uniform(1e6, 3e6, size)),
+                  holding_years=30, selling_cost=5)
+    print(f"Optimal exits of {size:,} listings over 360 months in {time.perf_counter() - start:.2f}s")
@@ -1,8 +1,34 @@
 from CostTable import CostTable
+from Profiler import PROFILER, PROFILE_FORMATS, ENV_VAR as PROFILE_ENV_VAR, instrument, stage
+from ResultWriter import ResultWriter, FORMATS
+from functools import lru_cache
 import argparse
 import os
+import sys
+
+# The calculator inputs, in constructor order. Batch modules (NumPy/pandas) are
+# imported only by the modes that use them, to keep single-scenario startup fast.
+PARAMETERS = (
+    'years',
+    'capital',
+    'purchase_cost',
+    'monthly_maintenance',
+    'rent',
+    'rent_increase',
+    'alternative_investment_increase',
+    'property_value',
+    'property_value_increase',
+    'interest_rate',
+)
+
+@lru_cache(maxsize=4096)
+def annuity_factor(monthly_rate, months):
+    """Monthly payment per unit of loan; (rate, term) pairs repeat heavily, so results are cached"""
+    growth = (1 + monthly_rate) ** months
+    return (monthly_rate * growth) / (growth - 1)
 
 class HomeCalculator:
+    @instrument('HomeCalculator.__init__')
     def __init__(
         self,
         years,
@@ -15,6 +41,8 @@ class HomeCalculator:
         property_value,
         property_value_increase,
         interest_rate,
+        tranches=None,
+        inflation=None,
     ):
         # Convert years to integer to ensure consistency
         self.years = int(years)
@@ -27,8 +55,20 @@ class HomeCalculator:
         self.property_value = property_value
         self.property_value_increase = property_value_increase
         self.interest_rate = interest_rate
+        self.inflation = inflation
         self.mortgage = property_value + purchase_cost - capital
-        self.monthly_payment = self.monthly_mortgage(self.mortgage, self.interest_rate / 100, self.years)
+        # A split mortgage (MortgageModel tranches) replaces the fixed-rate annuity;
+        # its headline payment is the first month's
+        self.mortgage_model = None
+        if tranches:
+            from MortgageModel import MortgageModel
+
+            self.mortgage_model = MortgageModel(self.mortgage, self.years, tranches, property_value=property_value,
+                                                property_value_increase=property_value_increase, months=self.years * 12)
+            self.monthly_payment = float(self.mortgage_model.payment[1])
+            self.tranches = list(tranches)
+        else:
+            self.monthly_payment = self.monthly_mortgage(self.mortgage, self.interest_rate / 100, self.years)
         self.cost_table = CostTable(
             years=self.years,
             capital=self.capital,
@@ -36,13 +76,46 @@ class HomeCalculator:
             monthly_maintenance=self.monthly_maintenance,
             rent=self.rent,
             rent_increase=self.rent_increase,
-            alternative_investment_increase=self.alternative_investment_increase
+            alternative_investment_increase=self.alternative_investment_increase,
+            loan_amount=self.mortgage,
+            interest_rate=self.interest_rate,
+            property_value=self.property_value,
+            property_value_increase=self.property_value_increase,
+            mortgage=self.mortgage_model,
+            inflation=self.inflation,
         )
 
+    @instrument('HomeCalculator.monthly_mortgage')
     def monthly_mortgage(self,  loan_amount, interest_rate, years):
         r = interest_rate / 12 # monthly interest rate
         n = years * 12 # number of months / total payments
-        return loan_amount * (r * (1 + r) ** n) / ((1 + r) ** n - 1)
+        return loan_amount * annuity_factor(r, n)
+
+    @instrument('HomeCalculator.summary')
+    def summary(self):
+        """Return the headline results as a dict of floats"""
+        property_future_value = self.property_value * (1 + self.property_value_increase / 100) ** (self.years)
+        total_investment_value = self.cost_table.total_investment_value()
+        summary = {
+            'mortgage': self.mortgage,
+            'monthly_payment': self.monthly_payment,
+            'total_buying_cost': self.cost_table.total_buying_cost(),
+            'total_rent_paid': self.cost_table.total_rent_paid(),
+            'total_investment_value': total_investment_value,
+            'property_future_value': property_future_value,
+            'diff': property_future_value - self.cost_table.remaining_balance() - total_investment_value,
+        }
+        if self.inflation is not None:
+            # The same results in today's money
+            deflator = self.cost_table.deflator()
+            summary.update({
+                'real_total_buying_cost': self.cost_table.real_total_buying_cost(),
+                'real_total_rent_paid': self.cost_table.real_total_rent_paid(),
+                'real_total_investment_value': total_investment_value * deflator,
+                'real_property_future_value': property_future_value * deflator,
+                'real_diff': summary['diff'] * deflator,
+            })
+        return summary
     
     def print_header(self):
         """Print a beautiful header for the calculator"""
@@ -57,12 +130,22 @@ class HomeCalculator:
     def print_mortgage(self):
         self.print_section_header("📊 MORTGAGE DETAILS")
         
+        total_payments = self.cost_table.total_mortgage_payments()
+        remaining_balance = self.cost_table.remaining_balance()
         print(f"📅  Loan Term:           {self.years} years")
         print(f"💳  Monthly Payment:     ${self.monthly_payment:>12,.2f}")
-        print(f"💰  Total Payments:      ${self.monthly_payment * self.years * 12:>12,.2f}")
-        print(f"💸  Total Interest:      ${self.monthly_payment * self.years * 12 - self.mortgage:>12,.2f}")
+        print(f"💰  Total Payments:      ${total_payments:>12,.2f}")
+        print(f"💸  Total Interest:      ${total_payments - self.mortgage + remaining_balance:>12,.2f}")
         print(f"🏦  Principal Amount:    ${self.mortgage:>12,.2f}")
-        print(f"📈  Interest Rate:       {self.interest_rate:>12.2f}%")
+        if self.mortgage_model is None:
+            print(f"📈  Interest Rate:       {self.interest_rate:>12.2f}%")
+            return
+        print(f"🏦  Balance at End:      ${remaining_balance:>12,.2f}")
+        for number, (tranche, payments) in enumerate(zip(self.tranches, self.mortgage_model.tranche_payments), 1):
+            rates = ' → '.join(f"{rate:.2f}%" + (f" (month {month})" if month else "") for month, rate in tranche.resets)
+            term = f", {tranche.years:g} years" if tranche.years is not None else ""
+            indexation = f", CPI {tranche.indexation:g}%" if tranche.indexation else ""
+            print(f"    Tranche {number}: {tranche.share:>6.1%} at {rates}{term}{indexation}, first payment ${payments[1]:,.2f}")
 
     def print_input(self):
         self.print_section_header("📋 INPUT PARAMETERS")
@@ -90,8 +173,10 @@ class HomeCalculator:
             right = right_col[i] if i < len(right_col) else ""
             print(f"{left:<40} {right}")
 
+    @instrument('HomeCalculator.print_output')
     def print_output(self):
         property_future_value = self.property_value * (1 + self.property_value_increase / 100) ** (self.years)
+        remaining_balance = self.cost_table.remaining_balance()
         total_investment_worth_at_end = self.cost_table.total_investment_value()
         
         self.print_section_header("📊 ANALYSIS RESULTS")
@@ -100,7 +185,9 @@ class HomeCalculator:
         print("🏠  BUYING SCENARIO:")
         print(f"    💰  Total Buying Cost:      ${self.cost_table.total_buying_cost():>12,.2f}")
         print(f"    📈  Property Future Value:  ${property_future_value:>12,.2f}")
-        print(f"    📊  Net Worth:              ${property_future_value - self.cost_table.total_buying_cost():>12,.2f}")
+        if remaining_balance:
+            print(f"    🏦  Balance Still Owed:     ${remaining_balance:>12,.2f}")
+        print(f"    📊  Net Worth:              ${property_future_value - remaining_balance - self.cost_table.total_buying_cost():>12,.2f}")
         
         print()
         
@@ -114,7 +201,7 @@ class HomeCalculator:
         print("🎯  RECOMMENDATION:")
         print("─" * 50)
 
-        diff = property_future_value - total_investment_worth_at_end
+        diff = property_future_value - remaining_balance - total_investment_worth_at_end
         if diff > 0:
             print("✅  RECOMMENDATION: BUY")
             print(f"    💡  You would be ${diff:,.2f} better off buying")
@@ -128,57 +215,312 @@ class HomeCalculator:
         print()
         print("📋  SUMMARY:")
         print("─" * 50)
-        buying_net = property_future_value
+        buying_net = property_future_value - remaining_balance
         renting_net = total_investment_worth_at_end
         print(f"    Buying Net Worth:  ${buying_net:>12,.2f}")
         print(f"    Renting Net Worth: ${renting_net:>12,.2f}")
         print(f"    Difference:        ${diff:>12,.2f}")
 
-def parse_arguments():
+        if self.inflation is not None:
+            self.print_real_terms(property_future_value, remaining_balance, total_investment_worth_at_end)
+
+    def print_real_terms(self, property_future_value, remaining_balance, total_investment_worth_at_end):
+        """Print the results in today's money, deflated at the inflation rate"""
+        deflator = self.cost_table.deflator()
+        buying_net = (property_future_value - remaining_balance) * deflator
+        renting_net = total_investment_worth_at_end * deflator
+
+        print()
+        print(f"💵  IN TODAY'S MONEY (inflation {self.inflation:.2f}%):")
+        print("─" * 50)
+        print(f"    💰  Buying Cost (PV):       ${self.cost_table.real_total_buying_cost():>12,.2f}")
+        print(f"    💸  Rent Paid (PV):         ${self.cost_table.real_total_rent_paid():>12,.2f}")
+        print(f"    Buying Net Worth:  ${buying_net:>12,.2f}")
+        print(f"    Renting Net Worth: ${renting_net:>12,.2f}")
+        print(f"    Difference:        ${buying_net - renting_net:>12,.2f}")
+
+def parse_arguments(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # In sweep mode every parameter accepts a list (5,10,15) or an inclusive range (3:8:0.25)
+    sweep = '--sweep' in argv
+
+    def value(cast):
+        if not sweep:
+            return cast
+        from ParameterSweep import parse_values
+
+        def values(spec):
+            try:
+                return parse_values(spec, cast)
+            except ValueError as error:
+                raise argparse.ArgumentTypeError(str(error))
+        return values
+
     parser = argparse.ArgumentParser(description='Home Buying Calculator - Compare buying vs renting costs')
     
-    parser.add_argument('--years', type=int, default=10, 
+    parser.add_argument('--years', type=value(int), default=10, 
                        help='Number of years to calculate')
-    parser.add_argument('--capital', type=float, default=500000,
+    parser.add_argument('--capital', type=value(float), default=500000,
                        help='Initial capital/down payment amount')
-    parser.add_argument('--purchase-cost', type=float, default=110000,
+    parser.add_argument('--purchase-cost', type=value(float), default=110000,
                        help='Additional purchase costs (closing costs, fees, etc.)')
-    parser.add_argument('--monthly-maintenance', type=float, default=200,
+    parser.add_argument('--monthly-maintenance', type=value(float), default=200,
                        help='Monthly maintenance costs')
-    parser.add_argument('--rent', type=float, default=4200,
+    parser.add_argument('--rent', type=value(float), default=4200,
                        help='Monthly rent amount')
-    parser.add_argument('--rent-increase', type=float, default=3,
+    parser.add_argument('--rent-increase', type=value(float), default=3,
                        help='Annual rent increase percentage')
-    parser.add_argument('--alternative-investment-increase', type=float, default=7,
+    parser.add_argument('--alternative-investment-increase', type=value(float), default=7,
                        help='Annual alternative investment return percentage')
-    parser.add_argument('--property-value', type=float, default=1600000,
+    parser.add_argument('--property-value', type=value(float), default=1600000,
                        help='Property value/purchase price')
-    parser.add_argument('--property-value-increase', type=float, default=4.5,
+    parser.add_argument('--property-value-increase', type=value(float), default=4.5,
                        help='Annual property value increase percentage')
-    parser.add_argument('--interest-rate', type=float, default=5,
+    parser.add_argument('--interest-rate', type=value(float), default=5,
                        help='Annual mortgage interest rate percentage')
-    return parser.parse_args()
+    parser.add_argument('--inflation', type=float,
+                       help='Annual inflation percentage; adds the results in today\'s money (present values)')
 
-def main():
-    args = parse_arguments()
-    
-    calculator = HomeCalculator(
+    def tranche(spec):
+        from MortgageModel import Tranche
+        try:
+            return Tranche.parse(spec)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(str(error))
+
+    mortgage_group = parser.add_argument_group('split mortgage')
+    mortgage_group.add_argument('--tranche', type=tranche, action='append', metavar='SHARE:RATES[:YEARS[:INDEXATION]]',
+                       help='Add a mortgage tranche instead of the single --interest-rate loan, e.g. 0.4:4.5 (fixed), '
+                            '0.3:6/60=5 (rate reset at month 60) or 0.3:3:20:2.5 (20 years, CPI-linked at 2.5%%); '
+                            'repeat for every tranche, the shares must add up to 1')
+
+    solver_group = parser.add_argument_group('break-even solver')
+    solver_group.add_argument('--breakeven', metavar='PARAMETER',
+                       help='Solve for the value of PARAMETER (e.g. interest_rate) at which buying and renting tie')
+    solver_group.add_argument('--bracket', type=float, nargs=2, metavar=('LOW', 'HIGH'),
+                       help='Search interval for --breakeven')
+
+    solver_group.add_argument('--gradient', action='store_true',
+                       help='Report the derivative of the buy-minus-rent difference with respect to every input')
+
+    exit_group = parser.add_argument_group('holding period')
+    exit_group.add_argument('--exit-analysis', action='store_true',
+                       help='Compare buying and renting for a sale at every month and report the best exit')
+    exit_group.add_argument('--holding-years', type=float,
+                       help='Years the property may be held, independent of the loan term --years (default: --years)')
+    exit_group.add_argument('--selling-cost', type=float, default=0,
+                       help='Selling costs as a percentage of the sale price')
+    exit_group.add_argument('--capital-gains-tax', type=float, default=0,
+                       help='Tax percentage on investment gains when the portfolios are sold')
+    exit_group.add_argument('--property-gains-tax', type=float, default=0,
+                       help='Tax percentage on the property gain when it is sold')
+
+    rank_group = parser.add_argument_group('listing ranking')
+    rank_group.add_argument('--rank', metavar='LISTINGS',
+                       help="Rank the listings of a CSV/Parquet file ('-' for CSV on stdin) with property_value, rent, "
+                            "purchase_cost and optionally id columns by buy advantage for the buyer given by the flags above")
+    rank_group.add_argument('--top', type=int, default=10,
+                       help='Number of listings to report with --rank')
+
+    batch_group = parser.add_argument_group('batch processing')
+    batch_group.add_argument('--sweep', action='store_true',
+                       help='Evaluate the Cartesian product of lists/ranges given for any parameter')
+    batch_group.add_argument('--input',
+                       help="Evaluate every scenario in a CSV/Parquet file ('-' for CSV on stdin); "
+                            "parameters missing from the file use the values of the flags above")
+    batch_group.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help='Number of worker processes for the sweep')
+    batch_group.add_argument('--chunk-size', type=int, default=100000,
+                       help='Number of scenarios evaluated per chunk/record batch')
+    batch_group.add_argument('--output', default='-',
+                       help="Output file for --sweep/--input ('-' for stdout)")
+    batch_group.add_argument('--format', choices=FORMATS,
+                       help='Output format (default: from the output file extension, else csv)')
+    batch_group.add_argument('--store',
+                       help='Write the --sweep results to a memory-mapped grid store file instead of CSV/Parquet')
+
+    profile_group = parser.add_argument_group('profiling')
+    profile_group.add_argument('--profile', nargs='?', const='-', metavar='PATH',
+                       help=f"Record per-stage timings and allocations and write them to PATH ('-' or no value for stderr); "
+                            f"also enabled by the {PROFILE_ENV_VAR} environment variable")
+    profile_group.add_argument('--profile-format', choices=PROFILE_FORMATS,
+                       help='Profile output format (default: folded stacks for .folded/.stacks files, else json)')
+    args = parser.parse_args(argv)
+    if args.tranche:
+        # Modes whose models only know the single --interest-rate loan
+        unsupported = [flag for flag, used in (('--gradient', args.gradient), ('--exit-analysis', args.exit_analysis),
+                                               ('--rank', args.rank), ('--store', args.store)) if used]
+        if unsupported:
+            parser.error(f"--tranche cannot be combined with {', '.join(unsupported)}")
+    if args.inflation is not None:
+        # Modes that report nominal figures only
+        unsupported = [flag for flag, used in (('--gradient', args.gradient), ('--exit-analysis', args.exit_analysis),
+                                               ('--rank', args.rank)) if used]
+        if unsupported:
+            parser.error(f"--inflation cannot be combined with {', '.join(unsupported)}")
+    return args
+
+def run_sweep(args):
+    from ParameterSweep import ParameterSweep
+
+    axes = {name: getattr(args, name) for name in PARAMETERS}
+    if args.store:
+        from GridStore import GridStore
+        GridStore.create(args.store, axes, workers=args.workers, chunk_size=args.chunk_size, inflation=args.inflation)
+        return
+    sweep = ParameterSweep(axes, workers=args.workers, chunk_size=args.chunk_size, tranches=args.tranche,
+                           inflation=args.inflation)
+    with ResultWriter(args.output, args.format) as writer:
+        sweep.run(writer)
+
+def run_input_file(args):
+    from BatchPipeline import BatchPipeline
+
+    defaults = {name: getattr(args, name) for name in PARAMETERS}
+    with ResultWriter(args.output, args.format) as writer:
+        BatchPipeline(args.input, writer, batch_size=args.chunk_size, defaults=defaults, tranches=args.tranche,
+                      inflation=args.inflation).run()
+
+def run_break_even(args):
+    from BreakEvenSolver import find_break_even
+
+    parameter = args.breakeven.replace('-', '_')
+    params = {name: getattr(args, name) for name in PARAMETERS}
+    current = params.get(parameter)
+    try:
+        value, evaluations = find_break_even(parameter, bracket=args.bracket, tranches=args.tranche, **params)
+    except ValueError as e:
+        print(f"❌  {e}")
+        sys.exit(1)
+
+    print("\n" + "="*70)
+    print("⚖️   BREAK-EVEN ANALYSIS")
+    print("="*70)
+    print(f"🎯  Parameter:           {parameter}")
+    print(f"📌  Current Value:       {current:>16,.4f}")
+    print(f"⚖️   Break-even Value:    {value:>16,.4f}")
+    print(f"🔁  Evaluations:         {evaluations:>16}")
+
+def run_gradient(args):
+    from GradientCalculator import GradientCalculator
+
+    params = {name: getattr(args, name) for name in PARAMETERS}
+    calculator = GradientCalculator(**params)
+    elasticities = calculator.elasticities()
+
+    print("\n" + "="*70)
+    print("🧭  SENSITIVITY OF THE DIFFERENCE (BUYING - RENTING)")
+    print("="*70)
+    print(f"📊  Difference:          ${float(calculator.diff):,.2f}")
+    print()
+    print(f"{'Parameter':<34}{'Value':>14}{'Per Unit':>16}{'Per +1%':>14}")
+    print("─" * 78)
+    for name in PARAMETERS:
+        print(f"{name:<34}{params[name]:>14,.2f}{float(calculator.gradient[name]):>16,.2f}"
+              f"{float(elasticities[name]):>14,.2f}")
+
+def run_exit_analysis(args):
+    from CashFlowEngine import CashFlowEngine
+
+    params = {name: getattr(args, name) for name in PARAMETERS}
+    engine = CashFlowEngine(
+        **params,
+        holding_years=args.holding_years,
+        selling_cost=args.selling_cost,
+        capital_gains_tax=args.capital_gains_tax,
+        property_gains_tax=args.property_gains_tax,
+    )
+    print("\n" + "="*70)
+    print("📆  HOLDING PERIOD ANALYSIS")
+    print("="*70)
+    print(f"{'📅  Sell After':<18}{'🏦 Balance':>16}{'🏠 Buyer Worth':>18}{'📈 Renter Worth':>18}{'💰 Difference':>16}")
+    for month in range(12, len(engine.month), 12):
+        print(f"    {month // 12:>3} years{'':<5}{engine.balance[month]:>16,.2f}{engine.buyer_net_worth[month]:>18,.2f}"
+              f"{engine.renter_net_worth[month]:>18,.2f}{engine.diff[month]:>16,.2f}")
+    best = engine.best_month
+    print("─"*70)
+    print(f"🎯  Best Exit:           month {best} ({best / 12:.1f} years)")
+    print(f"💰  Difference at Exit:  ${engine.best_diff:,.2f}")
+
+def run_ranking(args):
+    from BatchPipeline import prefetch, read_batches
+    from ListingRanker import ListingRanker
+
+    ranker = ListingRanker(
         years=args.years,
         capital=args.capital,
-        purchase_cost=args.purchase_cost,
+        interest_rate=args.interest_rate,
+        alternative_investment_increase=args.alternative_investment_increase,
         monthly_maintenance=args.monthly_maintenance,
-        rent=args.rent,
         rent_increase=args.rent_increase,
-        alternative_investment_increase=args.alternative_investment_increase,
-        property_value=args.property_value,
         property_value_increase=args.property_value_increase,
-        interest_rate=args.interest_rate
+        k=args.top,
     )
+    top = ranker.rank(prefetch(read_batches(args.rank, args.chunk_size)))
+    print("\n" + "="*70)
+    print(f"🏆  TOP {len(top)} OF {ranker.rows:,} LISTINGS BY BUY ADVANTAGE")
+    print("="*70)
+    print(f"{'#':>4}  {'🏷️ Listing':<14}{'🏠 Price':>16}{'💸 Rent':>12}{'🧾 Costs':>14}{'💰 Advantage':>16}")
+    for position, (listing_id, value, listing) in enumerate(top, 1):
+        print(f"{position:>4}  {str(listing_id):<14}{listing['property_value']:>16,.2f}{listing['rent']:>12,.2f}"
+              f"{listing['purchase_cost']:>14,.2f}{value:>16,.2f}")
+
+def run(args):
+    if args.sweep or args.input:
+        try:
+            run_sweep(args) if args.sweep else run_input_file(args)
+        except BrokenPipeError:
+            # The reader of stdout went away (e.g. piped into head); stop quietly
+            sys.stdout = open(os.devnull, 'w')
+        return
+    if args.breakeven:
+        run_break_even(args)
+        return
+    if args.gradient:
+        run_gradient(args)
+        return
+    if args.exit_analysis:
+        run_exit_analysis(args)
+        return
+    if args.rank:
+        run_ranking(args)
+        return
     
+    try:
+        calculator = HomeCalculator(
+            years=args.years,
+            capital=args.capital,
+            purchase_cost=args.purchase_cost,
+            monthly_maintenance=args.monthly_maintenance,
+            rent=args.rent,
+            rent_increase=args.rent_increase,
+            alternative_investment_increase=args.alternative_investment_increase,
+            property_value=args.property_value,
+            property_value_increase=args.property_value_increase,
+            interest_rate=args.interest_rate,
+            tranches=args.tranche,
+            inflation=args.inflation,
+        )
+    except ValueError as e:
+        print(f"❌  {e}")
+        sys.exit(1)
+
     calculator.print_header()
     calculator.print_input() 
     calculator.print_mortgage()
     calculator.print_output()
 
+def main():
+    args = parse_arguments()
+    if args.profile:
+        PROFILER.enable()
+    try:
+        with stage('main'):
+            run(args)
+    finally:
+        if args.profile:
+            PROFILER.write(args.profile, args.profile_format)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
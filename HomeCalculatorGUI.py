@@ -1,9 +1,14 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 from HomeCalculator import HomeCalculator
+from ResultCache import ResultCache
+from SensitivityPanel import SensitivityPanel
 import threading
 
 class HomeCalculatorGUI:
+    # Delay after the last keystroke before recalculating
+    DEBOUNCE_MS = 150
+    
     def __init__(self, root):
         self.root = root
         self.root.title("🏠 Home Buying vs Renting Calculator")
@@ -33,11 +38,29 @@ class HomeCalculatorGUI:
         self.style = ttk.Style()
         self.style.theme_use('clam')
         
+        # Identical inputs are answered from the cache instead of being recomputed
+        self.cache = ResultCache(max_size=256)
+        
+        # Live recalculation state: the newest request id, the pending debounce
+        # timer and the request waiting for the calculation worker
+        self._generation = 0
+        self._debounce_id = None
+        self._recommendation_color = None
+        self._request = None
+        self._request_lock = threading.Lock()
+        self._request_ready = threading.Event()
+        threading.Thread(target=self._calculation_worker, daemon=True).start()
+        
         # Variables to store input values
         self.vars = {}
         self.setup_variables()
         self.create_widgets()
         
+        # Recalculate as the inputs change, and once for the defaults
+        for var in self.vars.values():
+            var.trace_add('write', self._on_input_changed)
+        self.root.after_idle(self.calculate)
+        
         # Bind window resize event
         self.root.bind('<Configure>', self.on_window_resize)
         
@@ -53,7 +76,8 @@ class HomeCalculatorGUI:
             'alternative_investment_increase': tk.DoubleVar(value=7),
             'property_value': tk.DoubleVar(value=1600000),
             'property_value_increase': tk.DoubleVar(value=4.5),
-            'interest_rate': tk.DoubleVar(value=5)
+            'interest_rate': tk.DoubleVar(value=5),
+            'inflation': tk.DoubleVar(value=0)
         }
     
     def create_widgets(self):
@@ -68,12 +92,13 @@ class HomeCalculatorGUI:
         main_frame.columnconfigure(0, weight=1)  # Input column
         main_frame.columnconfigure(1, weight=1)  # Results column 1
         main_frame.columnconfigure(2, weight=1)  # Results column 2
+        main_frame.columnconfigure(3, weight=1)  # Sensitivity column
         main_frame.rowconfigure(1, weight=1)     # Results row
         
         # Title
         title_label = ttk.Label(main_frame, text="🏠 Home Buying vs Renting Calculator", 
                                font=('Arial', self.title_font_size, 'bold'))
-        title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
+        title_label.grid(row=0, column=0, columnspan=4, pady=(0, 20))
         
         # Create input section
         self.create_input_section(main_frame)
@@ -81,11 +106,15 @@ class HomeCalculatorGUI:
         # Create results sections (split into columns)
         self.create_results_section(main_frame)
         
+        # Heatmap and tornado chart, refreshed after every calculation
+        self.sensitivity = SensitivityPanel(main_frame, self.root, font_size=self.normal_font_size)
+        self.sensitivity.grid(row=1, column=3, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(15, 0))
+        
         # Status bar
         self.status_var = tk.StringVar(value="Ready to calculate")
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, 
                               relief=tk.SUNKEN, anchor=tk.W, font=('Arial', self.normal_font_size))
-        status_bar.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        status_bar.grid(row=2, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
     
     def create_input_section(self, parent):
         """Create the input parameters section"""
@@ -107,7 +136,8 @@ class HomeCalculatorGUI:
             ("📈 Rent Increase (%):", 'rent_increase', "Annual rent increase percentage"),
             ("📊 Alt. Investment Return (%):", 'alternative_investment_increase', "Annual alternative investment return percentage"),
             ("📈 Property Value Increase (%):", 'property_value_increase', "Annual property value increase percentage"),
-            ("💳 Interest Rate (%):", 'interest_rate', "Annual mortgage interest rate percentage")
+            ("💳 Interest Rate (%):", 'interest_rate', "Annual mortgage interest rate percentage"),
+            ("💵 Inflation (%):", 'inflation', "Annual inflation percentage, used for the figures in today's money")
         ]
         
         for i, (label_text, var_name, tooltip) in enumerate(inputs):
@@ -131,37 +161,65 @@ class HomeCalculatorGUI:
         self.style.configure('Accent.TButton', font=('Arial', self.button_font_size, 'bold'))
     
     def create_results_section(self, parent):
-        """Create the results display section with multiple columns"""
-        # Initialize results widgets dictionary
+        """Create the results display section with multiple columns
+
+        All result widgets are created once here; recalculations only change
+        their text, so nothing is torn down or rebuilt.
+        """
+        # Result labels by name, and the text variable behind each of them
         self.results_widgets = {}
+        self.result_vars = {}
+        self.style.configure('Result.TLabel', font=('Arial', self.normal_font_size))
+        self.style.configure('Recommendation.TLabel', font=('Arial', self.normal_font_size, 'bold'))
         
         # Create two separate frames for different columns
         # Column 1: Mortgage Details
         col1_frame = ttk.LabelFrame(parent, text="🏦 Mortgage Details", padding="10")
         col1_frame.grid(row=1, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(15, 5))
         col1_frame.columnconfigure(0, weight=1)
-        col1_frame.rowconfigure(0, weight=1)  # Make it expandable
         self.col1_frame = col1_frame
         
+        for i in range(6):
+            self._create_result_label(col1_frame, f'mortgage_{i}', row=i)
+        
         # Column 2: Cost Comparison, Property Analysis, and Recommendation
         col2_frame = ttk.LabelFrame(parent, text="💰 Costs & Analysis", padding="10")
         col2_frame.grid(row=1, column=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
         col2_frame.columnconfigure(0, weight=1)
-        col2_frame.rowconfigure(0, weight=1)  # Make it expandable
         self.col2_frame = col2_frame
         
-        # Initial messages
-        initial_label1 = ttk.Label(col1_frame, 
-                                  text="Click 'Calculate' to see the analysis results...",
-                                  font=('Arial', self.normal_font_size))
-        initial_label1.grid(row=0, column=0, pady=10)
-        self.results_widgets['initial1'] = initial_label1
+        # 1. Buying Scenario Frame
+        buying_frame = ttk.LabelFrame(col2_frame, text="🏠 BUYING SCENARIO", padding="10")
+        buying_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        buying_frame.columnconfigure(0, weight=1)
+        for i in range(4):
+            self._create_result_label(buying_frame, f'buying_{i}', row=i)
+        
+        # 2. Renting Scenario Frame
+        renting_frame = ttk.LabelFrame(col2_frame, text="🏠 RENTING SCENARIO", padding="10")
+        renting_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        renting_frame.columnconfigure(0, weight=1)
+        for i in range(4):
+            self._create_result_label(renting_frame, f'renting_{i}', row=i)
         
-        initial_label2 = ttk.Label(col2_frame, 
-                                  text="Click 'Calculate' to see the analysis results...",
-                                  font=('Arial', self.normal_font_size))
-        initial_label2.grid(row=0, column=0, pady=10)
-        self.results_widgets['initial2'] = initial_label2
+        # 3. Recommendation Frame
+        recommendation_frame = ttk.LabelFrame(col2_frame, text="🎯 RECOMMENDATION", padding="10")
+        recommendation_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        recommendation_frame.columnconfigure(0, weight=1)
+        self._create_result_label(recommendation_frame, 'recommendation', row=0, style='Recommendation.TLabel')
+        self._create_result_label(recommendation_frame, 'recommendation_detail', row=1)
+        self._create_result_label(recommendation_frame, 'recommendation_diff', row=2)
+        self._create_result_label(recommendation_frame, 'recommendation_real_diff', row=3)
+        
+        self.result_vars['mortgage_0'].set("Enter the input parameters to see the analysis results...")
+    
+    def _create_result_label(self, parent, name, row, style='Result.TLabel'):
+        """Create one result label backed by a text variable"""
+        var = tk.StringVar(value="")
+        label = ttk.Label(parent, textvariable=var, style=style)
+        label.grid(row=row, column=0, sticky=tk.W, pady=2)
+        self.results_widgets[name] = label
+        self.result_vars[name] = var
     
     def create_tooltip(self, widget, text):
         """Create a tooltip for a widget"""
@@ -184,117 +242,113 @@ class HomeCalculatorGUI:
         widget.bind('<Enter>', show_tooltip)
     
     def calculate(self):
-        """Perform the calculation in a separate thread"""
-        self.status_var.set("Calculating...")
-        self.root.update()
-        
-        # Run calculation in separate thread to prevent GUI freezing
-        thread = threading.Thread(target=self._calculate_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def _calculate_thread(self):
-        """Thread function for calculation"""
+        """Request a calculation of the current inputs
+
+        The latest request replaces any request that has not started yet, and
+        results of superseded requests are dropped when they arrive.
+        """
+        # A click on the button makes a pending debounced calculation redundant
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+            self._debounce_id = None
         try:
-            # Get values from variables
             args = {name: var.get() for name, var in self.vars.items()}
-            
-            # Create calculator instance
-            calculator = HomeCalculator(**args)
+        except (tk.TclError, ValueError):
+            # Incomplete input while typing (e.g. an empty field or a lone '-')
+            self.status_var.set("Waiting for valid input...")
+            return
+        
+        self._generation += 1
+        with self._request_lock:
+            self._request = (self._generation, args)
+            self._request_ready.set()
+        self.status_var.set("Calculating...")
+    
+    def _on_input_changed(self, *_):
+        """Recalculate once typing pauses for DEBOUNCE_MS"""
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+        self._debounce_id = self.root.after(self.DEBOUNCE_MS, self.calculate)
+    
+    def _calculation_worker(self):
+        """Background thread that runs one calculation at a time"""
+        while True:
+            self._request_ready.wait()
+            with self._request_lock:
+                self._request_ready.clear()
+                if self._request is None:
+                    continue
+                generation, args = self._request
+                self._request = None
+            try:
+                # Look up or compute the summary for these inputs
+                summary = self.cache.get_or_compute(args, lambda: HomeCalculator(**args).summary())
+                error = None
+            except Exception as e:
+                summary, error = None, e
             
             # Update GUI in main thread
-            self.root.after(0, self._update_results, calculator)
-            
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Calculation error: {str(e)}"))
-            self.root.after(0, lambda: self.status_var.set("Error occurred"))
+            self.root.after(0, self._apply_results, generation, args, summary, error)
+    
+    def _apply_results(self, generation, args, summary, error):
+        """Show a finished calculation unless newer inputs have been entered since"""
+        if generation != self._generation:
+            return
+        if error is not None:
+            self.status_var.set(f"Calculation error: {error}")
+            return
+        self._update_results(args, summary)
+        self.sensitivity.refresh(args)
     
-    def _update_results(self, calculator):
-        """Update the results display with organized frames in two columns"""
+    def _update_results(self, args, summary):
+        """Update the text of the result labels in place"""
         try:
-            # Clear previous results
-            for widget in self.results_widgets.values():
-                widget.destroy()
-            self.results_widgets.clear()
-            
-            # Get calculation results
-            results = self._get_calculation_results(calculator)
-            
-            # Calculate the key values using the calculator methods
-            total_buying_cost = calculator.cost_table.total_buying_cost()
-            total_rent_paid = calculator.cost_table.total_rent_paid()
-            total_investment_worth = calculator.cost_table.total_investment_value()
-            property_future_value = calculator.property_value * (1 + calculator.property_value_increase / 100) ** calculator.years
-            
-            # COLUMN 1: Mortgage Details
-            row1 = 1  # Start at row 1 since row 0 has the calculate button
-            
-            # Mortgage Details (all the details from terminal output)
-            mortgage_amount = calculator.property_value + calculator.purchase_cost - calculator.capital
-            monthly_payment = calculator.monthly_payment
-            total_payments = monthly_payment * calculator.years * 12
+            # Key values from the calculation summary
+            years = int(args['years'])
+            total_buying_cost = summary['total_buying_cost']
+            total_rent_paid = summary['total_rent_paid']
+            total_investment_worth = summary['total_investment_value']
+            property_future_value = summary['property_future_value']
+            
+            # COLUMN 1: Mortgage Details (all the details from terminal output)
+            mortgage_amount = summary['mortgage']
+            monthly_payment = summary['monthly_payment']
+            total_payments = monthly_payment * years * 12
             total_interest = total_payments - mortgage_amount
             
             mortgage_details = [
-                f"📅  Loan Term:           {calculator.years} years",
+                f"📅  Loan Term:           {years} years",
                 f"💳  Monthly Payment:     ${monthly_payment:>12,.2f}",
                 f"💰  Total Payments:      ${total_payments:>12,.2f}",
                 f"💸  Total Interest:      ${total_interest:>12,.2f}",
                 f"🏦  Principal Amount:    ${mortgage_amount:>12,.2f}",
-                f"📈  Interest Rate:       {calculator.interest_rate:>12.2f}%"
+                f"📈  Interest Rate:       {args['interest_rate']:>12.2f}%"
             ]
             
             for i, text in enumerate(mortgage_details):
-                label = ttk.Label(self.col1_frame, text=text, font=('Arial', self.normal_font_size))
-                label.grid(row=row1 + i, column=0, sticky=tk.W, pady=2)
-                self.results_widgets[f'mortgage_{i}'] = label
-            
-
+                self.result_vars[f'mortgage_{i}'].set(text)
             
             # COLUMN 2: Analysis Results (matching terminal exactly)
-            row2 = 0
-            
-            # 1. Buying Scenario Frame
-            buying_frame = ttk.LabelFrame(self.col2_frame, text="🏠 BUYING SCENARIO", padding="10")
-            buying_frame.grid(row=row2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
-            buying_frame.columnconfigure(0, weight=1)
-            row2 += 1
-            
-            buying_net_worth = property_future_value - total_buying_cost
-            
+            # Real figures: the costs discounted to today, the end values deflated
             buying_details = [
                 f"    💰  Total Buying Cost:      ${total_buying_cost:>12,.2f}",
-                f"    📈  Property Future Value:  ${property_future_value:>12,.2f}"
+                f"    📈  Property Future Value:  ${property_future_value:>12,.2f}",
+                f"    💵  Buying Cost (PV):       ${summary['real_total_buying_cost']:>12,.2f}",
+                f"    💵  Real Future Value:      ${summary['real_property_future_value']:>12,.2f}"
             ]
-            
             for i, text in enumerate(buying_details):
-                label = ttk.Label(buying_frame, text=text, font=('Arial', self.normal_font_size))
-                label.grid(row=i, column=0, sticky=tk.W, pady=2)
-                self.results_widgets[f'buying_{i}'] = label
-            
-            # 2. Renting Scenario Frame
-            renting_frame = ttk.LabelFrame(self.col2_frame, text="🏠 RENTING SCENARIO", padding="10")
-            renting_frame.grid(row=row2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
-            renting_frame.columnconfigure(0, weight=1)
-            row2 += 1
+                self.result_vars[f'buying_{i}'].set(text)
             
             renting_details = [
                 f"    💸  Total Rent Paid:        ${total_rent_paid:>12,.2f}",
-                f"    📈  Investment Worth:       ${total_investment_worth:>12,.2f}"
+                f"    📈  Investment Worth:       ${total_investment_worth:>12,.2f}",
+                f"    💵  Rent Paid (PV):         ${summary['real_total_rent_paid']:>12,.2f}",
+                f"    💵  Real Investment Worth:  ${summary['real_total_investment_value']:>12,.2f}"
             ]
-            
             for i, text in enumerate(renting_details):
-                label = ttk.Label(renting_frame, text=text, font=('Arial', self.normal_font_size))
-                label.grid(row=i, column=0, sticky=tk.W, pady=2)
-                self.results_widgets[f'renting_{i}'] = label
-            
-            # 3. Recommendation Frame
-            recommendation_frame = ttk.LabelFrame(self.col2_frame, text="🎯 RECOMMENDATION", padding="10")
-            recommendation_frame.grid(row=row2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
-            recommendation_frame.columnconfigure(0, weight=1)
-            row2 += 1
+                self.result_vars[f'renting_{i}'].set(text)
             
-            diff = property_future_value - total_investment_worth
+            diff = summary['diff']
             
             if diff > 0:
                 recommendation_text = f"✅  RECOMMENDATION: BUY"
@@ -305,31 +359,20 @@ class HomeCalculatorGUI:
                 detail_text = f"    💡  You would be ${abs(diff):,.2f} better off renting"
                 color = 'red'
             
-            rec_label = ttk.Label(recommendation_frame, 
-                                text=recommendation_text, 
-                                font=('Arial', self.normal_font_size, 'bold'),
-                                foreground=color)
-            rec_label.grid(row=0, column=0, sticky=tk.W, pady=2)
-            self.results_widgets['recommendation'] = rec_label
-            
-            detail_label = ttk.Label(recommendation_frame, 
-                                   text=detail_text, 
-                                   font=('Arial', self.normal_font_size),
-                                   foreground=color)
-            detail_label.grid(row=1, column=0, sticky=tk.W, pady=2)
-            self.results_widgets['recommendation_detail'] = detail_label
-            
-            diff_label = ttk.Label(recommendation_frame, 
-                                 text=f"    📊  Difference (Buying - Renting): ${diff:,.2f}", 
-                                 font=('Arial', self.normal_font_size))
-            diff_label.grid(row=2, column=0, sticky=tk.W, pady=2)
-            self.results_widgets['recommendation_diff'] = diff_label
+            self.result_vars['recommendation'].set(recommendation_text)
+            self.result_vars['recommendation_detail'].set(detail_text)
+            self.result_vars['recommendation_diff'].set(f"    📊  Difference (Buying - Renting): ${diff:,.2f}")
+            self.result_vars['recommendation_real_diff'].set(
+                f"    💵  In Today's Money ({args['inflation']:.2f}% inflation): ${summary['real_diff']:,.2f}")
+            if color != self._recommendation_color:
+                self.results_widgets['recommendation'].configure(foreground=color)
+                self.results_widgets['recommendation_detail'].configure(foreground=color)
+                self._recommendation_color = color
             
             self.status_var.set("Calculation completed successfully")
             
         except Exception as e:
-            messagebox.showerror("Error", f"Error updating results: {str(e)}")
-            self.status_var.set("Error updating results")
+            self.status_var.set(f"Error updating results: {e}")
     
     def _create_section_header(self, row, text):
         """Create a section header"""
@@ -338,18 +381,6 @@ class HomeCalculatorGUI:
         header.grid(row=row, column=0, sticky=tk.W, pady=(15, 5))
         self.results_widgets[f'header_{row}'] = header
     
-    def _get_calculation_results(self, calculator):
-        """Extract calculation results from the calculator"""
-        # This method can be expanded to extract more specific results
-        # For now, we'll use the cost table data
-        return {
-            'cost_table': calculator.cost_table.df,
-            'years': calculator.years,
-            'capital': calculator.capital,
-            'property_value': calculator.property_value,
-            'rent': calculator.rent
-        }
-    
     def on_window_resize(self, event):
         """Handle window resize events"""
         # Only handle main window resize, not child widgets
@@ -368,6 +399,8 @@ class HomeCalculatorGUI:
             # Update styles
             self.style.configure('Accent.TButton', font=('Arial', self.button_font_size, 'bold'))
             self.style.configure('TLabelframe.Label', font=('Arial', self.frame_title_font_size, 'bold'))
+            self.style.configure('Result.TLabel', font=('Arial', self.normal_font_size))
+            self.style.configure('Recommendation.TLabel', font=('Arial', self.normal_font_size, 'bold'))
 
 def main():
     root = tk.Tk()
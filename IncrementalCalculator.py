@@ -0,0 +1,250 @@
+from CostTable import CostTable
+from HomeCalculator import PARAMETERS, annuity_factor
+
+# Derived quantities and the inputs or quantities each one is computed from.
+# Totals are pure Python closed forms; the *_column entries are the monthly
+# CostTable columns and need NumPy, so they are only built when asked for.
+DEPENDENCIES = {
+    'horizon': ('years',),
+    'mortgage': ('property_value', 'purchase_cost', 'capital'),
+    'monthly_payment': ('mortgage', 'interest_rate', 'horizon'),
+    'growth_factors': ('alternative_investment_increase', 'horizon'),
+    'rent_factor': ('alternative_investment_increase', 'rent_increase', 'horizon'),
+    'property_future_value': ('property_value', 'property_value_increase', 'horizon'),
+    'total_buying_cost': ('capital', 'monthly_payment', 'monthly_maintenance', 'horizon'),
+    'total_rent_paid': ('rent', 'rent_increase', 'horizon'),
+    'total_investment_value': ('capital', 'monthly_payment', 'monthly_maintenance', 'rent', 'growth_factors', 'rent_factor'),
+    'diff': ('property_future_value', 'total_investment_value'),
+    'discount_column': ('alternative_investment_increase', 'horizon'),
+    'buying_cost_column': ('capital', 'monthly_payment', 'monthly_maintenance', 'horizon'),
+    'renting_cost_column': ('rent', 'rent_increase', 'horizon'),
+    'diff_column': ('buying_cost_column', 'renting_cost_column'),
+    'investment_column': ('diff_column', 'discount_column'),
+}
+
+# HomeCalculator.summary keys, all of which are nodes
+SUMMARY = (
+    'mortgage', 'monthly_payment', 'total_buying_cost', 'total_rent_paid',
+    'total_investment_value', 'property_future_value', 'diff',
+)
+
+
+def _dependents():
+    """Every node that has to be recomputed when a given input or node changes"""
+    direct = {}
+    for node, sources in DEPENDENCIES.items():
+        for source in sources:
+            direct.setdefault(source, []).append(node)
+    closure = {}
+
+    def visit(name):
+        if name not in closure:
+            closure[name] = set()
+            for node in direct.get(name, ()):
+                closure[name] |= {node} | visit(node)
+        return closure[name]
+
+    for name in (*PARAMETERS, *DEPENDENCIES):
+        visit(name)
+    return closure
+
+
+DEPENDENTS = _dependents()
+TOTALS = tuple(name for name in DEPENDENCIES if not name.endswith('_column'))
+_MISSING = object()
+
+
+class IncrementalCalculator:
+    """HomeCalculator that recomputes only what an input change invalidates.
+
+    update() compares the new inputs with the current ones and recomputes
+    only the quantities that depend on the changed inputs, so after a change
+    of rent_increase the mortgage payment and the investment growth factors
+    are reused and only the rent series and the totals built on it are
+    recomputed. The scalar totals are brought up to date right away, in
+    dependency order from a plan precomputed per input; the monthly columns
+    are dropped and rebuilt on the next columns() call, reusing the ones
+    that did not change (e.g. the discount vector of the investment column).
+    The results equal HomeCalculator.summary() and the CostTable columns for
+    the same inputs.
+    """
+
+    def __init__(self, **inputs):
+        missing = [name for name in PARAMETERS if name not in inputs]
+        if missing:
+            raise TypeError(f"Missing inputs: {', '.join(missing)}")
+        # Inputs and computed quantities share one dict
+        self._values = {}
+        self.update(**inputs)
+
+    @property
+    def inputs(self):
+        return {name: self._values[name] for name in PARAMETERS}
+
+    def update(self, **changes):
+        """Set new input values and recompute the totals that depend on them; returns self"""
+        values = self._values
+        changed = []
+        for name, value in changes.items():
+            if name not in PLANS:
+                raise TypeError(f"Unknown input '{name}', expected one of {', '.join(PARAMETERS)}")
+            if values.get(name, _MISSING) != value:
+                values[name] = value
+                changed.append(name)
+        if not changed:
+            return self
+        if len(changed) == 1:
+            plan, columns = PLANS[changed[0]], COLUMN_DEPENDENTS[changed[0]]
+        else:
+            stale = set().union(*[DEPENDENTS[name] for name in changed])
+            plan = [step for step in PLANS[None] if step[0] in stale]
+            columns = [name for name in COLUMN_DEPENDENTS[None] if name in stale]
+        for name in columns:
+            values.pop(name, None)
+        for name, compute, sources in plan:
+            values[name] = compute(*[values[source] for source in sources])
+        return self
+
+    def stale(self):
+        """Columns that are not computed for the current inputs"""
+        return [name for name in DEPENDENCIES if name not in self._values]
+
+    def __getattr__(self, name):
+        if name not in DEPENDENTS:
+            raise AttributeError(name)
+        return self.get(name)
+
+    def get(self, name):
+        """Value of an input or derived quantity; columns are computed here if they are not cached"""
+        values = self._values
+        value = values.get(name, _MISSING)
+        if value is _MISSING:
+            compute, sources = _COMPUTE[name]
+            value = values[name] = compute(*[self.get(source) for source in sources])
+        return value
+
+    def summary(self):
+        """Return the headline results as HomeCalculator.summary() does"""
+        values = self._values
+        return {name: values[name] for name in SUMMARY}
+
+    def columns(self):
+        """The CostTable columns (buying_cost, renting_cost, diff, investment) as NumPy arrays"""
+        return {name: self.get(f'{name}_column') for name in ('buying_cost', 'renting_cost', 'diff', 'investment')}
+
+    # Every quantity is computed from its DEPENDENCIES, passed in the same order.
+    # Closed-form totals, the same as HomeCalculator and CostTable:
+
+    @staticmethod
+    def _horizon(years):
+        return int(years)
+
+    @staticmethod
+    def _mortgage(property_value, purchase_cost, capital):
+        return property_value + purchase_cost - capital
+
+    @staticmethod
+    def _monthly_payment(mortgage, interest_rate, horizon):
+        return mortgage * annuity_factor(interest_rate / 100 / 12, horizon * 12)
+
+    @staticmethod
+    def _growth_factors(alternative_investment_increase, horizon):
+        return CostTable.growth_factors(alternative_investment_increase / 100, horizon)
+
+    @staticmethod
+    def _rent_factor(alternative_investment_increase, rent_increase, horizon):
+        return CostTable.rent_factor(alternative_investment_increase / 100, rent_increase / 100, horizon)
+
+    @staticmethod
+    def _property_future_value(property_value, property_value_increase, horizon):
+        return property_value * (1 + property_value_increase / 100) ** horizon
+
+    @staticmethod
+    def _total_buying_cost(capital, monthly_payment, monthly_maintenance, horizon):
+        return capital + (monthly_payment + monthly_maintenance) * horizon * 12
+
+    @staticmethod
+    def _total_rent_paid(rent, rent_increase, horizon):
+        return rent * 12 * CostTable.yearly_growth_sum(rent_increase / 100, horizon)
+
+    @staticmethod
+    def _total_investment_value(capital, monthly_payment, monthly_maintenance, rent, growth_factors, rent_factor):
+        growth, months_factor, year_factor = growth_factors
+        return capital * growth + (monthly_payment + monthly_maintenance) * months_factor - rent * year_factor * rent_factor
+
+    @staticmethod
+    def _diff(property_future_value, total_investment_value):
+        return property_future_value - total_investment_value
+
+    # Monthly columns, the same as CostTable.build_df:
+
+    @staticmethod
+    def _discount_column(alternative_investment_increase, horizon):
+        import numpy as np
+
+        return ((1 + alternative_investment_increase / 100) ** (1 / 12)) ** np.arange(horizon * 12, -1, -1, dtype=np.float64)
+
+    @staticmethod
+    def _buying_cost_column(capital, monthly_payment, monthly_maintenance, horizon):
+        import numpy as np
+
+        column = np.full(horizon * 12 + 1, monthly_payment + monthly_maintenance, dtype=np.float64)
+        column[0] = capital
+        return column
+
+    @staticmethod
+    def _renting_cost_column(rent, rent_increase, horizon):
+        import numpy as np
+
+        column = np.empty(horizon * 12 + 1, dtype=np.float64)
+        column[0] = 0
+        column[1:] = np.repeat(rent * (1 + rent_increase / 100) ** np.arange(horizon, dtype=np.float64), 12)
+        return column
+
+    @staticmethod
+    def _diff_column(buying_cost_column, renting_cost_column):
+        return buying_cost_column - renting_cost_column
+
+    @staticmethod
+    def _investment_column(diff_column, discount_column):
+        return diff_column * discount_column
+
+
+_COMPUTE = {name: (getattr(IncrementalCalculator, f'_{name}'), sources) for name, sources in DEPENDENCIES.items()}
+# DEPENDENCIES lists every quantity after its sources, so filtering it keeps the
+# dependency order. None is the plan for a change of several inputs.
+PLANS = {
+    name: tuple((node, *_COMPUTE[node]) for node in DEPENDENCIES if node in TOTALS and (name is None or node in DEPENDENTS[name]))
+    for name in (*PARAMETERS, None)
+}
+COLUMN_DEPENDENTS = {
+    name: tuple(node for node in DEPENDENCIES if node not in TOTALS and (name is None or node in DEPENDENTS[name]))
+    for name in (*PARAMETERS, None)
+}
+
+
+if __name__ == "__main__":
+    import itertools
+    import timeit
+
+    from HomeCalculator import HomeCalculator
+
+    scenario = dict(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200, rent=4200,
+                    rent_increase=3, alternative_investment_increase=7, property_value=1600000,
+                    property_value_increase=4.5, interest_rate=5)
+    calculator = IncrementalCalculator(**scenario)
+    calculator.columns()
+    calculator.update(rent_increase=3.5)
+    print(f"Columns to rebuild after a rent_increase change: {', '.join(calculator.stale())}")
+
+    # Alternate two values so that every update recomputes
+    rent_increases = itertools.cycle((3, 3.5))
+    runs = 2000
+    incremental = timeit.timeit(lambda: calculator.update(rent_increase=next(rent_increases)).summary(), number=runs) / runs
+    full = timeit.timeit(lambda: HomeCalculator(**scenario).summary(), number=runs) / runs
+    print(f"Totals after one change: {incremental * 1e6:.1f} µs incremental vs {full * 1e6:.1f} µs full rebuild")
+    incremental = timeit.timeit(lambda: calculator.update(rent_increase=next(rent_increases)).columns(), number=runs) / runs
+    full = timeit.timeit(lambda: IncrementalCalculator(**scenario).columns(), number=runs) / runs
+    print(f"Columns after one change: {incremental * 1e6:.1f} µs incremental vs {full * 1e6:.1f} µs computed from scratch")
+    full = timeit.timeit(lambda: HomeCalculator(**scenario).cost_table.df, number=200) / 200
+    print(f"CostTable DataFrame: {full * 1e6:.1f} µs")
@@ -0,0 +1,138 @@
+import heapq
+from itertools import count
+
+import numpy as np
+
+from BatchCalculator import BatchCalculator
+
+# Columns every listing must have; monthly_maintenance, rent_increase and
+# property_value_increase may be listing columns too, otherwise the profile's apply
+LISTING_COLUMNS = ('property_value', 'rent', 'purchase_cost')
+
+
+def _python_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ListingRanker:
+    """Rank listings by buy advantage (property_future_value - total_investment_value) for one buyer.
+
+    Everything that depends only on the buyer profile (the annuity factor, the
+    compounding factors of the alternative investment and, unless listings
+    override the rates, the rent and property growth factors) is computed
+    once. Each batch of listings is then a handful of vectorized operations,
+    after which its best k rows are merged into a bounded min-heap, so memory
+    stays O(k) however many listings are streamed through.
+    """
+
+    def __init__(self, years, capital, interest_rate, alternative_investment_increase,
+                 monthly_maintenance=0, rent_increase=0, property_value_increase=0, k=10):
+        self.years = int(years)
+        self.capital = float(capital)
+        self.monthly_maintenance = float(monthly_maintenance)
+        self.rent_increase = float(rent_increase)
+        self.property_value_increase = float(property_value_increase)
+        self.k = int(k)
+        self.rows = 0
+        self._heap = []
+        self._sequence = count()
+
+        # Monthly payment per unit of loan and the investment compounding sums
+        self.annuity = float(BatchCalculator.monthly_mortgage(1.0, interest_rate / 100, self.years))
+        self.a = alternative_investment_increase / 100
+        self.growth, self.months_factor, self.year_factor = (
+            float(value) for value in BatchCalculator.compounding_factors(self.a, self.years))
+        self.rent_factor = self._rent_factor(self.rent_increase)
+        self.property_growth = (1 + self.property_value_increase / 100) ** self.years
+
+    def _rent_factor(self, rent_increase):
+        """Sum over y of (1 + g) ** y * (1 + a) ** (years - 1 - y)"""
+        g = np.asarray(rent_increase, dtype=np.float64) / 100
+        return BatchCalculator.rent_factor(self.a, g, self.years, self.growth)
+
+    def evaluate(self, columns):
+        """Buy-minus-rent of every listing in a batch of columns"""
+        missing = [name for name in LISTING_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Listings are missing the columns: {', '.join(missing)}")
+        property_value = np.asarray(columns['property_value'], dtype=np.float64)
+        rent = np.asarray(columns['rent'], dtype=np.float64)
+        purchase_cost = np.asarray(columns['purchase_cost'], dtype=np.float64)
+        maintenance = columns.get('monthly_maintenance', self.monthly_maintenance)
+        rent_factor = self._rent_factor(columns['rent_increase']) if 'rent_increase' in columns else self.rent_factor
+        property_growth = (
+            (1 + np.asarray(columns['property_value_increase'], dtype=np.float64) / 100) ** self.years
+            if 'property_value_increase' in columns else self.property_growth
+        )
+
+        monthly_cost = self.annuity * (property_value + purchase_cost - self.capital) + maintenance
+        investment = self.capital * self.growth + monthly_cost * self.months_factor - rent * self.year_factor * rent_factor
+        return property_value * property_growth - investment
+
+    def push(self, columns):
+        """Evaluate a batch of listings and keep the best k seen so far.
+
+        Listings are identified by an 'id' column when there is one, else by
+        their position in the stream.
+        """
+        diff = self.evaluate(columns)
+        rows = len(diff)
+        ids = columns['id'] if 'id' in columns else np.arange(self.rows, self.rows + rows)
+        self.rows += rows
+
+        # Only the batch's own top k can enter the heap
+        candidates = np.flatnonzero(~np.isnan(diff))
+        if len(candidates) > self.k:
+            candidates = candidates[np.argpartition(-diff[candidates], self.k - 1)[:self.k]]
+        for i in candidates:
+            value = float(diff[i])
+            if len(self._heap) == self.k and value <= self._heap[0][0]:
+                continue
+            listing = {name: _python_value(columns[name][i]) for name in columns}
+            item = (value, next(self._sequence), _python_value(ids[i]), listing)
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            else:
+                heapq.heapreplace(self._heap, item)
+
+    def rank(self, batches):
+        """Stream batches of listing columns through the ranker and return the top k"""
+        for columns in batches:
+            self.push(columns)
+        return self.top()
+
+    def top(self):
+        """The best listings so far as (id, diff, listing columns), best first"""
+        return [(listing_id, value, listing) for value, _, listing_id, listing in sorted(self._heap, reverse=True)]
+
+
+if __name__ == "__main__":
+    import time
+
+    from HomeCalculator import HomeCalculator
+
+    profile = dict(years=10, capital=500000, interest_rate=5, alternative_investment_increase=7,
+                   monthly_maintenance=200, rent_increase=3, property_value_increase=4.5)
+    rng = np.random.default_rng(0)
+    size, batch_size = 2_000_000, 100_000
+
+    ranker = ListingRanker(**profile, k=10)
+    start = time.perf_counter()
+    for offset in range(0, size, batch_size):
+        ranker.push({
+            'property_value': rng.uniform(8e5, 3e6, batch_size),
+            'rent': rng.uniform(2000, 9000, batch_size),
+            'purchase_cost': rng.uniform(5e4, 2e5, batch_size),
+        })
+    elapsed = time.perf_counter() - start
+    print(f"Ranked {size:,} listings in {elapsed:.2f}s ({size / elapsed:,.0f} listings/s, including generation)")
+
+    calculator_args = dict(profile)
+    del calculator_args['monthly_maintenance']
+    start = time.perf_counter()
+    for _ in range(10_000):
+        HomeCalculator(purchase_cost=110000, rent=4200, property_value=1600000, monthly_maintenance=200, **calculator_args).summary()
+    elapsed = time.perf_counter() - start
+    print(f"One HomeCalculator per listing: {10_000 / elapsed:,.0f} listings/s")
+    for listing_id, value, listing in ranker.top()[:3]:
+        print(f"#{listing_id}: {value:,.2f}")
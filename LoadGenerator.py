@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+# Scenario sent by every request, with a little noise on the rates
+BASE_SCENARIO = dict(
+    years=10,
+    capital=500000,
+    purchase_cost=110000,
+    monthly_maintenance=200,
+    rent=4200,
+    rent_increase=3,
+    alternative_investment_increase=7,
+    property_value=1600000,
+    property_value_increase=4.5,
+    interest_rate=5,
+)
+
+
+async def client(host, port, path, deadline, latencies, errors):
+    """Send requests over one keep-alive connection until the deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            scenario = dict(BASE_SCENARIO, interest_rate=random.uniform(3, 7), rent=random.uniform(3000, 6000))
+            body = json.dumps(scenario).encode()
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status_line:
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+
+async def run(host, port, path, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, path, deadline, latencies, errors) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "─"*70)
+    print("🚀  LOAD TEST RESULTS")
+    print("─"*70)
+    print(f"🔁  Requests:         {len(latencies):>12,}")
+    print(f"❌  Errors:           {len(errors):>12,}")
+    print(f"⚡  Throughput:       {len(latencies) / elapsed:>12,.0f} req/s")
+    if latencies:
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(f"⏱️   Latency p50:      {percentiles[49] * 1000:>12.2f} ms")
+        print(f"⏱️   Latency p95:      {percentiles[94] * 1000:>12.2f} ms")
+        print(f"⏱️   Latency p99:      {percentiles[98] * 1000:>12.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for CalculatorService')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--path', default='/calculate', help='Endpoint to load')
+    parser.add_argument('--concurrency', type=int, default=64, help='Number of concurrent connections')
+    parser.add_argument('--duration', type=float, default=10, help='Test duration in seconds')
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.path, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from BatchCalculator import BatchCalculator
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_chunk(scenario, seed, paths, investment_returns=None, rent_growth=None, property_returns=None):
+    """Simulate one chunk of paths and return the buy-minus-rent outcome of each.
+
+    scenario holds the HomeCalculator inputs plus the volatility settings.
+    Supplied return paths replace the random draws for that rate: monthly
+    returns for the investment and the property (paths x months) and yearly
+    rent growth (paths x years), all as fractions.
+    """
+    rng = np.random.default_rng(seed)
+    years = int(scenario['years'])
+    months = years * 12
+
+    # Monthly log returns; the constant annual rates are the median of each lognormal path
+    if investment_returns is None:
+        mean = np.log1p(scenario['alternative_investment_increase'] / 100) / 12
+        volatility = scenario['investment_volatility'] / 100 / np.sqrt(12)
+        log_investment = rng.normal(mean, volatility, (paths, months)) if volatility else np.full((paths, months), mean)
+    else:
+        log_investment = np.log1p(investment_returns)
+    if property_returns is None:
+        mean = np.log1p(scenario['property_value_increase'] / 100) / 12
+        volatility = scenario['property_volatility'] / 100 / np.sqrt(12)
+        log_property = rng.normal(mean, volatility, (paths, months)) if volatility else np.full((paths, months), mean)
+    else:
+        log_property = np.log1p(property_returns)
+
+    # Rent growth follows an AR(1) process around the constant rate, one step per year
+    if rent_growth is None:
+        mean = scenario['rent_increase'] / 100
+        volatility = scenario['rent_growth_volatility'] / 100
+        persistence = scenario['rent_growth_persistence']
+        rent_growth = np.empty((paths, years))
+        previous = np.full(paths, mean)
+        for year in range(years):
+            shock = rng.normal(0, volatility, paths) if volatility else 0
+            previous = mean + persistence * (previous - mean) + shock
+            rent_growth[:, year] = previous
+    # Rent in year y has grown by the first y yearly steps
+    yearly_rent = np.empty((paths, years))
+    yearly_rent[:, 0] = scenario['rent']
+    if years > 1:
+        yearly_rent[:, 1:] = scenario['rent'] * np.cumprod(1 + rent_growth[:, :years - 1], axis=1)
+    monthly_rent = np.repeat(yearly_rent, 12, axis=1)
+
+    # Growth of a deposit made in month m until the end of the horizon
+    cumulative = np.cumsum(log_investment, axis=1)
+    total = cumulative[:, -1:]
+    growth_to_end = np.exp(total - cumulative)
+    monthly_cost = scenario['monthly_payment'] + scenario['monthly_maintenance']
+    investment = scenario['capital'] * np.exp(total[:, 0]) + ((monthly_cost - monthly_rent) * growth_to_end).sum(axis=1)
+
+    property_future_value = scenario['property_value'] * np.exp(log_property.sum(axis=1))
+    return property_future_value - investment
+
+
+class MonteCarloSimulator:
+    """Monte Carlo buy-vs-rent simulation with stochastic rates.
+
+    Investment and property returns are drawn as monthly lognormal returns and
+    rent growth as a yearly AR(1) process, or taken from user-supplied paths.
+    Paths are simulated in chunks so memory stays within chunk_size x months,
+    and every chunk gets its own RNG stream spawned from the seed, so results
+    are identical however many worker processes are used.
+    """
+
+    def __init__(
+        self,
+        years,
+        capital,
+        purchase_cost,
+        monthly_maintenance,
+        rent,
+        rent_increase,
+        alternative_investment_increase,
+        property_value,
+        property_value_increase,
+        interest_rate,
+        investment_volatility=15,
+        property_volatility=10,
+        rent_growth_volatility=1,
+        rent_growth_persistence=0.5,
+    ):
+        base = BatchCalculator(
+            years=years,
+            capital=capital,
+            purchase_cost=purchase_cost,
+            monthly_maintenance=monthly_maintenance,
+            rent=rent,
+            rent_increase=rent_increase,
+            alternative_investment_increase=alternative_investment_increase,
+            property_value=property_value,
+            property_value_increase=property_value_increase,
+            interest_rate=interest_rate,
+        )
+        self.years = int(years)
+        self.deterministic_diff = float(base.diff)
+        self.scenario = dict(
+            years=self.years,
+            capital=capital,
+            monthly_maintenance=monthly_maintenance,
+            rent=rent,
+            rent_increase=rent_increase,
+            alternative_investment_increase=alternative_investment_increase,
+            property_value=property_value,
+            property_value_increase=property_value_increase,
+            monthly_payment=float(base.monthly_payment),
+            investment_volatility=investment_volatility,
+            property_volatility=property_volatility,
+            rent_growth_volatility=rent_growth_volatility,
+            rent_growth_persistence=rent_growth_persistence,
+        )
+        self.outcomes = None
+
+    def run(self, paths=100_000, seed=None, chunk_size=10_000, workers=1,
+            investment_returns=None, rent_growth=None, property_returns=None):
+        """Simulate the paths and return the buy-minus-rent outcome of each.
+
+        Supplied paths (see simulate_chunk) fix the number of paths.
+        """
+        supplied = [path for path in (investment_returns, rent_growth, property_returns) if path is not None]
+        if supplied:
+            paths = len(supplied[0])
+        chunks = [(start, min(start + chunk_size, paths)) for start in range(0, paths, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+        def arguments(start, stop, chunk_seed):
+            def part(path):
+                return None if path is None else np.asarray(path, dtype=np.float64)[start:stop]
+            return (self.scenario, chunk_seed, stop - start,
+                    part(investment_returns), part(rent_growth), part(property_returns))
+
+        tasks = [arguments(start, stop, chunk_seed) for (start, stop), chunk_seed in zip(chunks, seeds)]
+        if workers == 1:
+            results = [simulate_chunk(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(simulate_chunk, *zip(*tasks)))
+        self.outcomes = np.concatenate(results) if results else np.empty(0)
+        return self.outcomes
+
+    def summary(self):
+        """Percentiles of the buy-minus-rent outcome and the probability that buying wins"""
+        if self.outcomes is None:
+            raise RuntimeError("Call run() before summary()")
+        return {
+            'paths': len(self.outcomes),
+            'mean': float(self.outcomes.mean()),
+            'percentiles': dict(zip(PERCENTILES, np.percentile(self.outcomes, PERCENTILES).tolist())),
+            'probability_buy': float((self.outcomes > 0).mean()),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n" + "─"*70)
+        print("🎲  MONTE CARLO SIMULATION")
+        print("─"*70)
+        print(f"🔁  Paths:                      {summary['paths']:>15,}")
+        print(f"📌  Deterministic Difference:  ${self.deterministic_diff:>15,.2f}")
+        print(f"📊  Mean Difference:           ${summary['mean']:>15,.2f}")
+        for percentile, value in summary['percentiles'].items():
+            print(f"    P{percentile:<2} (Buying - Renting):   ${value:>15,.2f}")
+        print(f"✅  Probability Buying Wins:    {summary['probability_buy']:>15.1%}")
+
+
+if __name__ == "__main__":
+    simulator = MonteCarloSimulator(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200,
+                                    rent=4200, rent_increase=3, alternative_investment_increase=7,
+                                    property_value=1600000, property_value_increase=4.5, interest_rate=5)
+    simulator.run(paths=100_000, seed=42)
+    simulator.print_summary()
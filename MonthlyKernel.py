@@ -0,0 +1,194 @@
+import numpy as np
+
+# Numba is optional: with it the monthly loop is compiled and runs in parallel
+# over scenarios, without it the same recurrence runs as NumPy operations
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    prange = range
+    NUMBA_AVAILABLE = False
+
+BACKENDS = ('auto', 'numba', 'numpy')
+OUTPUTS = ('payment', 'balance', 'buying_cost', 'renting_cost', 'investment', 'home_value')
+
+
+def _recurrence(loan_amount, term, capital, maintenance, property_value, rate, investment_return,
+                property_return, rent, prepayment, payment, balance, buying_cost, renting_cost, investment, home_value):
+    """Month-by-month loop over every scenario, writing into the output arrays.
+
+    Plain Python over scalars so that Numba can compile it; scenarios are
+    independent, so the outer loop is a prange.
+    """
+    scenarios, months = rate.shape
+    for s in prange(scenarios):
+        remaining = loan_amount[s]
+        current_payment = 0.0
+        value = property_value[s]
+        invested = capital[s]
+        balance[s, 0] = remaining
+        buying_cost[s, 0] = capital[s]
+        renting_cost[s, 0] = 0.0
+        payment[s, 0] = 0.0
+        investment[s, 0] = invested
+        home_value[s, 0] = value
+        for m in range(1, months + 1):
+            r = rate[s, m - 1]
+            # The payment is set at the start and reset whenever the rate changes,
+            # over the months left of the term
+            if remaining > 0 and (m == 1 or r != rate[s, m - 2]):
+                left = term[s] - m + 1
+                if left <= 0:
+                    current_payment = remaining * (1 + r)
+                elif r == 0:
+                    current_payment = remaining / left
+                else:
+                    growth = (1 + r) ** left
+                    current_payment = remaining * r * growth / (growth - 1)
+            due = 0.0
+            if remaining > 0:
+                owed = remaining * (1 + r)
+                due = min(current_payment + prepayment[s, m - 1], owed)
+                remaining = owed - due
+                if remaining < 1e-9:
+                    remaining = 0.0
+            payment[s, m] = due
+            balance[s, m] = remaining
+            cost = due + maintenance[s]
+            buying_cost[s, m] = cost
+            renting_cost[s, m] = rent[s, m - 1]
+            invested = invested * (1 + investment_return[s, m - 1]) + cost - rent[s, m - 1]
+            investment[s, m] = invested
+            value = value * (1 + property_return[s, m - 1])
+            home_value[s, m] = value
+
+
+_compiled = None
+
+
+def _numba_kernel():
+    global _compiled
+    if _compiled is None:
+        _compiled = njit(parallel=True, cache=True)(_recurrence)
+    return _compiled
+
+
+def _numpy_recurrence(loan_amount, term, capital, maintenance, property_value, rate, investment_return,
+                      property_return, rent, prepayment, payment, balance, buying_cost, renting_cost, investment, home_value):
+    """The same recurrence vectorized over scenarios, one NumPy step per month"""
+    months = rate.shape[1]
+    # Work month-major so that every step reads and writes contiguous rows
+    rate, investment_return, property_return, rent, prepayment = (
+        np.ascontiguousarray(path.T) for path in (rate, investment_return, property_return, rent, prepayment))
+    outputs = {name: np.empty((months + 1, len(loan_amount))) for name in OUTPUTS}
+    remaining = loan_amount.copy()
+    current_payment = np.zeros_like(remaining)
+    invested = capital.copy()
+    value = property_value.copy()
+    outputs['balance'][0] = remaining
+    outputs['buying_cost'][0] = capital
+    outputs['renting_cost'][0] = 0
+    outputs['payment'][0] = 0
+    outputs['investment'][0] = invested
+    outputs['home_value'][0] = value
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for m in range(1, months + 1):
+            r = rate[m - 1]
+            reset = remaining > 0
+            if m > 1:
+                reset &= r != rate[m - 2]
+            if reset.any():
+                left = term - m + 1
+                growth = (1 + r) ** left
+                annuity = np.where(r == 0, remaining / left, remaining * r * growth / (growth - 1))
+                annuity = np.where(left <= 0, remaining * (1 + r), annuity)
+                current_payment = np.where(reset, annuity, current_payment)
+            # As in the loop, only an outstanding balance accrues interest and is paid down;
+            # a loan that is zero or negative (capital above the price) is left as it is
+            active = remaining > 0
+            owed = remaining * (1 + r)
+            due = np.where(active, np.minimum(current_payment + prepayment[m - 1], owed), 0)
+            remaining = np.where(active, owed - due, remaining)
+            remaining[active & (remaining < 1e-9)] = 0
+            cost = due + maintenance
+            invested = invested * (1 + investment_return[m - 1]) + cost - rent[m - 1]
+            value = value * (1 + property_return[m - 1])
+            outputs['payment'][m] = due
+            outputs['balance'][m] = remaining
+            outputs['buying_cost'][m] = cost
+            outputs['renting_cost'][m] = rent[m - 1]
+            outputs['investment'][m] = invested
+            outputs['home_value'][m] = value
+    for name, output in zip(OUTPUTS, (payment, balance, buying_cost, renting_cost, investment, home_value)):
+        output[...] = outputs[name].T
+
+
+def simulate_months(loan_amount, term, capital, monthly_maintenance, property_value, rate, investment_return,
+                    property_return, rent, prepayment=None, backend='auto'):
+    """Run the monthly cost-table recurrence for path-dependent inputs.
+
+    Per-scenario values have shape (scenarios,); the paths `rate`,
+    `investment_return` and `property_return` (monthly fractions), `rent` and
+    `prepayment` (extra principal paid each month) have shape
+    (scenarios, months). `term` is the loan term in months. Returns the
+    OUTPUTS as (scenarios, months + 1) arrays with month 0 first, where
+    `investment` is the running value of the invested buy-minus-rent
+    differences, as in CostTable.
+
+    backend='auto' uses the compiled Numba kernel when Numba is installed and
+    the NumPy implementation otherwise.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend == 'numba' and not NUMBA_AVAILABLE:
+        raise ImportError("The numba backend requires numba (pip install numba)")
+
+    rate = np.atleast_2d(np.asarray(rate, dtype=np.float64))
+    scenarios, months = rate.shape
+    paths = [np.ascontiguousarray(np.broadcast_to(np.asarray(path, dtype=np.float64), (scenarios, months)))
+             for path in (investment_return, property_return, rent, 0.0 if prepayment is None else prepayment)]
+    values = [np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=np.float64), (scenarios,)))
+              for value in (loan_amount, term, capital, monthly_maintenance, property_value)]
+    outputs = {name: np.empty((scenarios, months + 1)) for name in OUTPUTS}
+
+    use_numba = backend == 'numba' or (backend == 'auto' and NUMBA_AVAILABLE)
+    kernel = _numba_kernel() if use_numba else _numpy_recurrence
+    kernel(*values, np.ascontiguousarray(rate), *paths, *outputs.values())
+    return outputs
+
+
+def constant_paths(months, interest_rate, alternative_investment_increase, property_value_increase,
+                   rent, rent_increase):
+    """Paths for constant annual rates (in %), matching the closed-form calculator"""
+    month = np.arange(months)
+    columns = [np.asarray(value, dtype=np.float64).reshape(-1, 1) for value in (
+        interest_rate, alternative_investment_increase, property_value_increase, rent, rent_increase)]
+    interest_rate, alternative_investment_increase, property_value_increase, rent, rent_increase = np.broadcast_arrays(*columns)
+    return {
+        'rate': np.broadcast_to(interest_rate / 100 / 12, (len(interest_rate), months)),
+        'investment_return': np.broadcast_to(np.expm1(np.log1p(alternative_investment_increase / 100) / 12), (len(interest_rate), months)),
+        'property_return': np.broadcast_to(np.expm1(np.log1p(property_value_increase / 100) / 12), (len(interest_rate), months)),
+        'rent': rent * (1 + rent_increase / 100) ** (month // 12),
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    size, years = 20_000, 30
+    months = years * 12
+    paths = constant_paths(months, rng.uniform(2, 8, size), 7, 4.5, rng.uniform(3000, 6000, size), 3)
+    # Rate reset after five years and a yearly lump-sum prepayment
+    paths['rate'] = np.where(np.arange(months) < 60, paths['rate'], paths['rate'] + 0.01 / 12)
+    prepayment = np.where(np.arange(months) % 12 == 11, 20000.0, 0.0)
+    inputs = dict(loan_amount=1210000, term=months, capital=500000, monthly_maintenance=200,
+                  property_value=1600000, prepayment=prepayment, **paths)
+    for backend in ('numba', 'numpy') if NUMBA_AVAILABLE else ('numpy',):
+        if backend == 'numba':
+            simulate_months(**inputs, backend=backend)  # compile
+        start = time.perf_counter()
+        simulate_months(**inputs, backend=backend)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:>6}: {size:,} scenarios x {months} months in {elapsed:.3f}s ({size / elapsed:,.0f} scenarios/s)")
@@ -0,0 +1,189 @@
+import numpy as np
+
+from AmortizationSchedule import COLUMNS
+
+
+def parse_rates(spec):
+    """Parse a rate schedule: '4.5' or resets as '4.5/60=5.5/120=6' (rate from month 0, then month=rate)"""
+    resets = []
+    for i, part in enumerate(str(spec).split('/')):
+        month, _, rate = part.rpartition('=')
+        if not month and i > 0:
+            raise ValueError(f"Invalid rate schedule '{spec}', expected rate/month=rate/...")
+        resets.append((int(month) if month else 0, float(rate)))
+    return resets
+
+
+class Tranche:
+    """One part of a split mortgage.
+
+    `share` is the fraction of the loan in this tranche. `rate` is the annual
+    rate in %, either fixed or a list of (month, rate) resets starting at
+    month 0, e.g. a prime-linked tranche [(0, 4.5), (60, 5.5)]. `years` is the
+    term (None for the calculator's years) and `indexation` the annual % by
+    which the balance and payments are linked to the CPI. Shares and rates may
+    be per-scenario arrays; reset months are shared by all scenarios.
+    """
+
+    def __init__(self, share=1.0, rate=5, years=None, indexation=0):
+        self.share = share
+        self.resets = sorted(rate) if isinstance(rate, (list, tuple)) else [(0, rate)]
+        if self.resets[0][0] != 0:
+            raise ValueError("A rate schedule must start at month 0")
+        self.years = years
+        self.indexation = indexation
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse SHARE:RATES[:YEARS[:INDEXATION]], e.g. '0.4:4.5/60=5.5:25:2'"""
+        parts = spec.split(':')
+        if not 2 <= len(parts) <= 4:
+            raise ValueError(f"Invalid tranche '{spec}', expected SHARE:RATES[:YEARS[:INDEXATION]]")
+        years = float(parts[2]) if len(parts) > 2 and parts[2] else None
+        indexation = float(parts[3]) if len(parts) > 3 else 0
+        return cls(float(parts[0]), parse_rates(parts[1]), years, indexation)
+
+    def schedule(self, loan_amount, term, month):
+        """Nominal payment and balance of this tranche for every month.
+
+        loan_amount and term (months) are column arrays (scenarios x 1) and
+        month a row of month numbers starting at 0. Within each rate segment
+        the payment is the annuity of the balance over the remaining term, so
+        payments are recomputed only at the resets and each segment is a
+        closed form. Indexation scales the real balance and payment by the
+        CPI index of the month.
+        """
+        balance = np.empty(np.broadcast_shapes(loan_amount.shape, month.shape))
+        payment = np.zeros_like(balance)
+        real_balance = loan_amount * np.asarray(self.share, dtype=np.float64).reshape(-1, 1)
+        balance[:, :1] = real_balance
+        months = len(month) - 1
+        ends = [start for start, _ in self.resets[1:]] + [months]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for (start, rate), end in zip(self.resets, ends):
+                end = min(end, months)
+                if start >= end:
+                    continue
+                r = np.asarray(rate, dtype=np.float64).reshape(-1, 1) / 100 / 12
+                log_growth = np.log1p(r)
+                remaining = term - start
+                # Annuity of the balance at the reset over the months left of the term
+                annuity = np.where(
+                    r == 0,
+                    real_balance / remaining,
+                    real_balance * r / -np.expm1(-remaining * log_growth),
+                )
+                annuity = np.where(remaining > 0, annuity, 0.0)
+                elapsed = np.minimum(month[start + 1:end + 1] - start, np.maximum(remaining, 0))
+                growth = np.expm1(elapsed * log_growth)
+                segment = np.where(r == 0, real_balance - annuity * elapsed, real_balance * (1 + growth) - annuity * growth / r)
+                balance[:, start + 1:end + 1] = segment
+                payment[:, start + 1:end + 1] = np.where(month[start + 1:end + 1] - start <= remaining, annuity, 0.0)
+                real_balance = segment[:, -1:]
+
+        if np.any(self.indexation):
+            monthly_index = np.log1p(np.asarray(self.indexation, dtype=np.float64).reshape(-1, 1) / 100) / 12
+            index = np.exp(month * monthly_index)
+            balance *= index
+            payment *= index
+        # Guard against rounding noise once the loan is repaid
+        balance[np.abs(balance) < 1e-6] = 0.0
+        return payment, balance
+
+
+class MortgageModel:
+    """Split mortgage made of tranches with their own terms, rate resets and indexation.
+
+    Inputs broadcast like AmortizationSchedule: scalar inputs give 1-D arrays
+    over months 0..N, array inputs give 2-D arrays (scenarios x months). The
+    columns mirror AmortizationSchedule (payment, interest, principal, balance,
+    equity), summed over the tranches; interest is the payment less the
+    principal repaid, so it includes any indexation. `years` is the term of
+    tranches without their own and `months` the minimum length of the
+    schedule, which always covers the longest term.
+    """
+
+    def __init__(self, loan_amount, years, tranches, property_value=None, property_value_increase=0, months=None):
+        if not tranches:
+            raise ValueError("A mortgage needs at least one tranche")
+        loan_amount, years, property_value, property_value_increase = np.broadcast_arrays(*[
+            np.asarray(value, dtype=np.float64) for value in (
+                loan_amount, years,
+                loan_amount if property_value is None else property_value,
+                property_value_increase,
+            )
+        ])
+        scalar = loan_amount.ndim == 0
+        loan_amount, years, property_value, property_value_increase = (
+            value.reshape(-1, 1) for value in (loan_amount, years, property_value, property_value_increase)
+        )
+        shares = sum(np.asarray(tranche.share, dtype=np.float64) for tranche in tranches)
+        if not np.allclose(shares, 1):
+            raise ValueError("Tranche shares must add up to 1")
+
+        terms = [np.trunc(years if tranche.years is None else np.asarray(tranche.years, dtype=np.float64).reshape(-1, 1)) * 12
+                 for tranche in tranches]
+        longest = int(max(np.max(term) for term in terms))
+        self.month = np.arange(max(longest, 0 if months is None else int(months)) + 1, dtype=np.float64)
+
+        self.payment = np.zeros((len(loan_amount), len(self.month)))
+        self.balance = np.zeros_like(self.payment)
+        self.tranche_payments = []
+        for tranche, term in zip(tranches, terms):
+            payment, balance = tranche.schedule(loan_amount, np.broadcast_to(term, loan_amount.shape), self.month)
+            self.tranche_payments.append(payment)
+            self.payment += payment
+            self.balance += balance
+
+        self.principal = np.zeros_like(self.balance)
+        self.principal[:, 1:] = self.balance[:, :-1] - self.balance[:, 1:]
+        self.interest = np.zeros_like(self.balance)
+        self.interest[:, 1:] = self.payment[:, 1:] - self.principal[:, 1:]
+        home_value = property_value * (1 + property_value_increase / 100) ** (self.month / 12)
+        self.equity = home_value - self.balance
+
+        if scalar:
+            for name in COLUMNS:
+                setattr(self, name, getattr(self, name)[0])
+            self.tranche_payments = [payment[0] for payment in self.tranche_payments]
+
+    def columns(self):
+        """Return the schedule columns keyed by name"""
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def equity_at(self, month):
+        """Equity after the given month (e.g. for an early sale)"""
+        return self.equity[..., month]
+
+    def totals(self, years, alternative_investment_increase):
+        """Sum of the payments and their value compounded to the end of `years`, and the balance then.
+
+        These replace the fixed-payment closed forms of the calculators;
+        `years` may differ per scenario.
+        """
+        payment = np.atleast_2d(self.payment)
+        balance = np.atleast_2d(self.balance)
+        months = np.trunc(np.asarray(years, dtype=np.float64)).reshape(-1, 1) * 12
+        log_q = np.log1p(np.asarray(alternative_investment_increase, dtype=np.float64).reshape(-1, 1) / 100) / 12
+        within = (self.month >= 1) & (self.month <= months)
+        total = np.where(within, payment, 0).sum(axis=1)
+        compounded = np.where(within, payment * np.exp((months - self.month) * log_q), 0).sum(axis=1)
+        index = np.broadcast_to(np.minimum(months, len(self.month) - 1).astype(np.intp), (len(balance), 1))
+        remaining = np.take_along_axis(balance, index, axis=1)[:, 0]
+        if np.ndim(self.payment) == 1:
+            return float(total[0]), float(compounded[0]), float(remaining[0])
+        return total, compounded, remaining
+
+
+if __name__ == "__main__":
+    # A typical split: a fixed tranche, a prime-linked tranche with a rate rise
+    # after five years and a CPI-linked tranche
+    tranches = [
+        Tranche(1 / 3, 4.8),
+        Tranche(1 / 3, [(0, 6.0), (60, 5.0)]),
+        Tranche(1 / 3, 3.2, years=20, indexation=2.5),
+    ]
+    mortgage = MortgageModel(1210000, 30, tranches, property_value=1600000, property_value_increase=4.5)
+    for month in (1, 60, 61, 240, 241, 360):
+        print(f"Month {month:>3}: payment {mortgage.payment[month]:>10,.2f}  interest {mortgage.interest[month]:>10,.2f}"
+              f"  balance {mortgage.balance[month]:>14,.2f}")
@@ -0,0 +1,98 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os
+
+import numpy as np
+
+from BatchCalculator import BatchCalculator, PARAMETERS
+from ResultWriter import format_csv
+
+
+def parse_values(spec, cast=float):
+    """Parse a sweep value: '5', a list '5,10,15' or an inclusive range '3:8:0.25'"""
+    spec = str(spec).strip()
+    if ':' in spec:
+        parts = spec.split(':')
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid range '{spec}', expected start:stop[:step]")
+        start, stop = float(parts[0]), float(parts[1])
+        step = float(parts[2]) if len(parts) == 3 else 1.0
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid range '{spec}', expected start <= stop and a positive step")
+        # Small tolerance so that the stop value is included despite rounding
+        count = int((stop - start) / step + 1e-9) + 1
+        values = [start + i * step for i in range(count)]
+        # Casting e.g. 10:12:0.5 to int would repeat years instead of stepping by half a year
+        if any(cast(value) != value for value in values):
+            raise ValueError(f"Invalid range '{spec}', every value must be a whole number")
+        return [cast(value) for value in values]
+    return [cast(value) for value in spec.split(',') if value.strip()]
+
+
+def evaluate_chunk(axes, start, stop, csv=False, tranches=None, inflation=None):
+    """Evaluate grid points [start, stop) of the Cartesian product of the axes
+
+    With csv=True the chunk is rendered to CSV text here, so the formatting
+    work is spread over the worker processes as well. `tranches` (see
+    MortgageModel) apply to every grid point; an `inflation` rate adds the
+    REAL_RESULTS columns.
+    """
+    shape = tuple(len(axes[name]) for name in PARAMETERS)
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    inputs = {name: axes[name][index] for name, index in zip(PARAMETERS, indices)}
+    batch = BatchCalculator(**inputs, tranches=tranches, inflation=inflation)
+    columns = dict(inputs)
+    columns['years'] = columns['years'].astype(np.int64)
+    columns.update(batch.results())
+    if csv:
+        return list(columns), format_csv(columns), stop - start
+    return columns
+
+
+class ParameterSweep:
+    """Evaluate the Cartesian product of parameter values in chunks.
+
+    Chunks are spread over a pool of worker processes and handed back in grid
+    order, with only a few chunks in flight at once so memory stays bounded
+    however large the grid is.
+    """
+
+    def __init__(self, axes, workers=None, chunk_size=100_000, tranches=None, inflation=None):
+        self.axes = {name: np.atleast_1d(np.asarray(axes[name], dtype=np.float64)) for name in PARAMETERS}
+        self.shape = tuple(len(self.axes[name]) for name in PARAMETERS)
+        self.size = int(np.prod(self.shape))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = int(chunk_size)
+        self.tranches = tranches
+        self.inflation = inflation
+
+    def chunks(self):
+        for start in range(0, self.size, self.chunk_size):
+            yield start, min(start + self.chunk_size, self.size)
+
+    def results(self, csv=False):
+        """Yield result chunks in grid order (see evaluate_chunk for the chunk layout)"""
+        if self.workers == 1:
+            for start, stop in self.chunks():
+                yield evaluate_chunk(self.axes, start, stop, csv, self.tranches, self.inflation)
+            return
+
+        max_pending = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for start, stop in self.chunks():
+                pending.append(executor.submit(evaluate_chunk, self.axes, start, stop, csv, self.tranches, self.inflation))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, writer):
+        """Stream every chunk to a ResultWriter and return the number of rows written"""
+        if writer.format == 'csv':
+            for names, text, rows in self.results(csv=True):
+                writer.write_csv(names, text, rows)
+        else:
+            for columns in self.results():
+                writer.write(columns)
+        return writer.rows
@@ -0,0 +1,205 @@
+from collections import defaultdict
+from functools import wraps
+import os
+import sys
+import time
+
+# Set to an output path (or 1 for stderr) to profile any program using the calculator
+ENV_VAR = 'HOME_CALCULATOR_PROFILE'
+PROFILE_FORMATS = ('json', 'folded')
+
+
+class _NullStage:
+    """Stage used while profiling is off; entering and leaving it does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start', 'blocks', 'traced', 'child_ns')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.child_ns = 0
+        tracemalloc = self.profiler._tracemalloc
+        self.traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        blocks = sys.getallocatedblocks() - self.blocks
+        traced = self.profiler._tracemalloc.get_traced_memory()[0] - self.traced if self.traced is not None else None
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_ns += elapsed
+        path = tuple(stage.name for stage in stack) + (self.name,)
+        self.profiler.record(path, elapsed, elapsed - self.child_ns, blocks, traced)
+        return False
+
+
+class Profiler:
+    """Opt-in timing and allocation counters for named stages of the calculation.
+
+    Wrap code in `with stage('name'):` or decorate functions and methods with
+    `@instrument('name')`. While disabled, stage() returns a shared no-op
+    context and instrumented functions are left untouched: enable() patches
+    timing wrappers into their modules and classes and disable() removes
+    them, so a disabled profiler costs nothing on the hot paths.
+
+    Every stage records its wall time in a log2 histogram (microsecond
+    buckets) and the net change in allocated Python memory blocks; when
+    tracemalloc is tracing (python -X tracemalloc) the net traced bytes,
+    including NumPy buffers, are recorded too. Nested stages are kept as
+    call stacks for a flamegraph-compatible folded stack file.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        # Self time in nanoseconds per call stack
+        self.stacks = defaultdict(int)
+        self._instrumented = []
+        self._lock = None
+
+    def reset(self):
+        self.stages = {}
+        self.stacks = defaultdict(int)
+
+    def enable(self):
+        # Imported here so that importing the calculator stays fast when profiling is off
+        import threading
+        import tracemalloc
+
+        if self._lock is None:
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._tracemalloc = tracemalloc
+        self.enabled = True
+        for func, name in self._instrumented:
+            self._patch(func, self._wrap(func, name))
+
+    def disable(self):
+        self.enabled = False
+        for func, name in self._instrumented:
+            self._patch(func, func)
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def instrument(self, name=None):
+        """Decorator timing every call of a function or method as a stage while profiling is on"""
+        def decorator(func):
+            stage_name = name or func.__qualname__
+            self._instrumented.append((func, stage_name))
+            return self._wrap(func, stage_name) if self.enabled else func
+        return decorator
+
+    def _wrap(self, func, name):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(self, name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    def _patch(func, replacement):
+        """Replace func where it is defined (module global or class attribute)"""
+        owner = sys.modules.get(func.__module__)
+        *path, attribute = func.__qualname__.split('.')
+        for part in path:
+            owner = getattr(owner, part, None)
+        current = getattr(owner, attribute, None)
+        if current is func or getattr(current, '__wrapped__', None) is func:
+            setattr(owner, attribute, replacement)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def record(self, path, elapsed_ns, self_ns, blocks, traced=None):
+        name = path[-1]
+        # Bucket k holds durations up to 2**k microseconds
+        bucket = max(0, (elapsed_ns // 1000).bit_length())
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {
+                    'count': 0, 'total_ns': 0, 'min_ns': elapsed_ns, 'max_ns': elapsed_ns,
+                    'blocks': 0, 'traced_bytes': None, 'histogram': defaultdict(int),
+                }
+            stats['count'] += 1
+            stats['total_ns'] += elapsed_ns
+            stats['min_ns'] = min(stats['min_ns'], elapsed_ns)
+            stats['max_ns'] = max(stats['max_ns'], elapsed_ns)
+            stats['blocks'] += blocks
+            if traced is not None:
+                stats['traced_bytes'] = (stats['traced_bytes'] or 0) + traced
+            stats['histogram'][bucket] += 1
+            self.stacks[path] += self_ns
+
+    def report(self):
+        """Per-stage statistics as a JSON-serializable dict, slowest total first"""
+        with self._lock or _NULL_STAGE:
+            items = sorted(self.stages.items(), key=lambda item: -item[1]['total_ns'])
+            return {
+                name: {
+                    'count': stats['count'],
+                    'total_ms': stats['total_ns'] / 1e6,
+                    'mean_us': stats['total_ns'] / stats['count'] / 1e3,
+                    'min_us': stats['min_ns'] / 1e3,
+                    'max_us': stats['max_ns'] / 1e3,
+                    'allocated_blocks': stats['blocks'],
+                    'traced_bytes': stats['traced_bytes'],
+                    'histogram_us': {f"<={2 ** bucket}": count for bucket, count in sorted(stats['histogram'].items())},
+                }
+                for name, stats in items
+            }
+
+    def folded(self):
+        """Folded stacks ('outer;inner self-time-in-us' per line) for flamegraph.pl or speedscope"""
+        with self._lock or _NULL_STAGE:
+            return ''.join(f"{';'.join(path)} {max(1, self_ns // 1000)}\n" for path, self_ns in sorted(self.stacks.items()))
+
+    def write(self, path='-', format=None):
+        """Write the report to path ('-' for stderr) as JSON or folded stacks"""
+        format = format or ('folded' if path.endswith(('.folded', '.stacks')) else 'json')
+        if format not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{format}', expected one of {', '.join(PROFILE_FORMATS)}")
+        import json
+
+        text = self.folded() if format == 'folded' else json.dumps(self.report(), indent=2) + '\n'
+        if path == '-':
+            sys.stderr.write(text)
+        else:
+            with open(path, 'w') as handle:
+                handle.write(text)
+
+
+PROFILER = Profiler()
+stage = PROFILER.stage
+instrument = PROFILER.instrument
+
+_target = os.environ.get(ENV_VAR)
+if _target:
+    import atexit
+
+    PROFILER.enable()
+    atexit.register(PROFILER.write, '-' if _target.lower() in ('1', 'true', 'yes') else _target)
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+
+from HomeCalculator import PARAMETERS
+
+
+class ResultCache:
+    """Bounded LRU cache of calculation summaries keyed on the input parameters.
+
+    Parameters are normalized (years truncated, floats rounded to `precision`
+    decimals) so that equivalent inputs share one entry. Options passed along
+    with the parameters (e.g. inflation) are part of the key too. Entries expire after
+    `ttl` seconds when a ttl is given. With a `path`, entries are also written
+    to an SQLite file so warm results survive restarts.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, path=None, precision=6):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, created REAL)')
+            self._db.commit()
+
+    def key(self, params):
+        """Normalized parameter tuple used as the cache key"""
+        options = tuple(
+            (name, round(float(value), self.precision) if isinstance(value, (int, float)) else value)
+            for name, value in sorted(params.items()) if name not in PARAMETERS
+        )
+        return tuple(
+            int(params[name]) if name == 'years' else round(float(params[name]), self.precision)
+            for name in PARAMETERS
+        ) + options
+
+    def get(self, params):
+        """Return the cached summary for params, or None"""
+        key = self.key(params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1], time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+        loaded = self._load(key)
+        with self._lock:
+            if loaded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Keep the original insertion time so the entry still expires ttl after it was computed
+            value, created = loaded
+            self._store(key, value, created)
+        return value
+
+    def put(self, params, value):
+        key = self.key(params)
+        with self._lock:
+            self._store(key, value)
+        self._save(key, value)
+
+    def get_or_compute(self, params, compute):
+        """Return the cached summary for params, computing and caching it on a miss"""
+        value = self.get(params)
+        if value is None:
+            value = compute()
+            self.put(params, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / requests if requests else 0.0,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def _store(self, key, value, created=None):
+        self._entries[key] = (value, time.monotonic() if created is None else created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key):
+        """(value, insertion time on the monotonic clock) from the database, or None"""
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute('SELECT value, created FROM results WHERE key = ?', (json.dumps(key),)).fetchone()
+        now = time.time()
+        if row is None or self._expired(row[1], now):
+            return None
+        # The database stores wall-clock times, the in-memory entries monotonic ones
+        return json.loads(row[0]), time.monotonic() - (now - row[1])
+
+    def _save(self, key, value):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', (json.dumps(key), json.dumps(value), time.time()))
+            self._db.commit()
@@ -0,0 +1,118 @@
+import numpy as np
+
+from BatchCalculator import PARAMETERS, RESULTS
+
+FIELDS = PARAMETERS + RESULTS
+
+# Packed record layout: whole years, inputs in single precision and results in
+# double precision, 85 bytes per scenario
+RESULT_DTYPE = np.dtype(
+    [('years', np.uint8)]
+    + [(name, np.float32) for name in PARAMETERS if name != 'years']
+    + [(name, np.float64) for name in RESULTS]
+)
+
+
+class ScenarioResult:
+    """Inputs and results of one scenario, without the calculator or its cost table"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for name in FIELDS:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def from_calculator(cls, calculator):
+        """Keep only the numbers of a HomeCalculator"""
+        values = {name: getattr(calculator, name) for name in PARAMETERS}
+        values.update(calculator.summary())
+        return cls(**{name: values[name] for name in FIELDS})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __repr__(self):
+        return f"ScenarioResult(years={self.years}, diff={self.diff:,.2f})"
+
+
+class ResultSet:
+    """Columnar container of many scenario results backed by a NumPy structured array.
+
+    Columns are views into the array; filtering, sorting and top-k return new
+    ResultSets. save() writes the array as .npy, which load() can memory-map.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    @classmethod
+    def from_columns(cls, columns, dtype=RESULT_DTYPE):
+        """Build from a mapping of column name to array (e.g. inputs plus BatchCalculator.results())"""
+        size = len(np.atleast_1d(columns['diff']))
+        records = np.empty(size, dtype=dtype)
+        for name in dtype.names:
+            records[name] = columns[name]
+        return cls(records)
+
+    @classmethod
+    def from_batch(cls, batch, dtype=RESULT_DTYPE):
+        """Build from a BatchCalculator"""
+        return cls.from_columns({name: getattr(batch, name) for name in FIELDS}, dtype)
+
+    @classmethod
+    def concatenate(cls, result_sets):
+        return cls(np.concatenate([result_set.records for result_set in result_sets]))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Open a .npy file written by save(), memory-mapped by default"""
+        return cls(np.load(path, mmap_mode=mmap_mode))
+
+    def save(self, path):
+        np.save(path, self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.records[key]
+        if isinstance(key, (int, np.integer)):
+            record = self.records[key]
+            return ScenarioResult(**{name: record[name].item() for name in FIELDS})
+        return ResultSet(self.records[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes
+
+    def filter(self, mask):
+        """Scenarios where the boolean mask is true, e.g. result_set.filter(result_set['diff'] > 0)"""
+        return ResultSet(self.records[np.asarray(mask, dtype=bool)])
+
+    def sort(self, by='diff', descending=True):
+        order = np.argsort(self.records[by], kind='stable')
+        return ResultSet(self.records[order[::-1] if descending else order])
+
+    def top_k(self, k, by='diff', descending=True):
+        """The k best scenarios by one column, in order, without sorting the whole set"""
+        values = self.records[by]
+        k = min(k, len(values))
+        if k == 0:
+            return ResultSet(self.records[:0])
+        keys = -values if descending else values
+        best = np.argpartition(keys, k - 1)[:k]
+        return ResultSet(self.records[best[np.argsort(keys[best], kind='stable')]])
+
+    def to_arrow(self):
+        """Convert to a pyarrow Table (each interleaved column is copied once into Arrow layout)"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Arrow export requires pyarrow (pip install pyarrow)") from None
+        return pa.table({name: np.ascontiguousarray(self.records[name]) for name in self.records.dtype.names})
@@ -0,0 +1,94 @@
+import sys
+
+FORMATS = ('csv', 'parquet')
+
+
+def format_csv(columns):
+    """Render a chunk of columns as CSV rows (without a header)"""
+    import numpy as np
+
+    arrays = [np.asarray(array) for array in columns.values()]
+    rows = len(arrays[0])
+    if rows == 0:
+        return ''
+    values = [array.tolist() for array in arrays]
+    if any(array.dtype.kind not in 'biuf' for array in arrays):
+        # Text columns may need quoting, so let the csv module handle them
+        import csv
+        import io
+
+        text = io.StringIO()
+        csv.writer(text, lineterminator='\n').writerows(zip(*values))
+        return text.getvalue()
+    # One '%s' per column keeps integers as integers and floats at full precision
+    row_format = ','.join(['%s'] * len(arrays)) + '\n'
+    return ''.join(row_format % row for row in zip(*values))
+
+
+class ResultWriter:
+    """Stream columns of results to a CSV or Parquet file one chunk at a time.
+
+    A path of None or '-' writes to stdout. Parquet output needs pyarrow.
+    """
+
+    def __init__(self, path=None, format=None):
+        self.path = None if path == '-' else path
+        self.format = format or self.infer_format(self.path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown output format '{self.format}', expected one of {', '.join(FORMATS)}")
+        self.rows = 0
+        self._handle = None
+        self._parquet_writer = None
+
+    @staticmethod
+    def infer_format(path):
+        if path and path.lower().endswith(('.parquet', '.pq')):
+            return 'parquet'
+        return 'csv'
+
+    def write(self, columns):
+        """Append a chunk given as a mapping of column name to array"""
+        if self.format == 'csv':
+            self.write_csv(list(columns), format_csv(columns), len(next(iter(columns.values()))))
+        else:
+            self._write_parquet(columns)
+
+    def write_csv(self, names, text, rows):
+        """Append CSV rows already rendered by format_csv (e.g. in a worker process)"""
+        if self._handle is None:
+            self._handle = open(self.path, 'w', newline='') if self.path else sys.stdout
+            self._handle.write(','.join(names) + '\n')
+        self._handle.write(text)
+        self.rows += rows
+
+    def _write_parquet(self, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from None
+        import numpy as np
+
+        table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+        if self._parquet_writer is None:
+            sink = self.path if self.path else sys.stdout.buffer
+            self._parquet_writer = pq.ParquetWriter(sink, table.schema)
+        self._parquet_writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if self._handle is not None:
+            if self._handle is sys.stdout:
+                self._handle.flush()
+            else:
+                self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,212 @@
+import base64
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from HomeCalculator import PARAMETERS
+
+# Heatmap resolutions, computed coarse first so the panel fills in progressively
+RESOLUTIONS = (25, 50, 100, 200)
+
+
+def parameter_label(name):
+    return name.replace('_', ' ').title()
+
+
+def axis_range(base, spread):
+    """Interval of +/- spread (a fraction) around base, or [0, 1] when base is 0"""
+    span = abs(base) * spread
+    if span == 0:
+        return 0.0, 1.0
+    return base - span, base + span
+
+
+def heatmap_image(args, x_name, y_name, resolution, size, spread):
+    """Evaluate buy-minus-rent on a resolution x resolution grid and render it.
+
+    Returns (PPM image data as base64 text, x range, y range, largest |diff|).
+    The grid is evaluated in one batch and scaled to size x size pixels with
+    nearest-neighbour sampling, green where buying wins and red where renting does.
+    """
+    import numpy as np
+    from BatchCalculator import BatchCalculator
+
+    x_range = axis_range(args[x_name], spread)
+    y_range = axis_range(args[y_name], spread)
+    x = np.linspace(*x_range, resolution)
+    # Row 0 is the top of the image, so y runs from high to low
+    y = np.linspace(*y_range, resolution)[::-1]
+    params = dict(args)
+    params[x_name] = x[np.newaxis, :]
+    params[y_name] = y[:, np.newaxis]
+    with np.errstate(all='ignore'):
+        diff = BatchCalculator(**params).diff
+
+    finite = np.isfinite(diff)
+    scale = np.abs(diff[finite]).max() if finite.any() else 1.0
+    value = np.clip(np.where(finite, diff, 0) / (scale or 1.0), -1, 1)
+    # Diverging colour map: red (rent) -> white -> green (buy)
+    strength = np.abs(value)
+    rgb = np.empty(value.shape + (3,))
+    rgb[..., 0] = np.where(value > 0, 1 - 0.8 * strength, 1)
+    rgb[..., 1] = np.where(value > 0, 1 - 0.4 * strength, 1 - 0.8 * strength)
+    rgb[..., 2] = 1 - 0.8 * strength
+    rgb[~finite] = 0.5
+    pixels = (rgb * 255).astype(np.uint8)
+
+    index = np.arange(size) * resolution // size
+    pixels = pixels[index][:, index]
+    header = f"P6 {size} {size} 255\n".encode()
+    return base64.b64encode(header + pixels.tobytes()).decode(), x_range, y_range, scale
+
+
+def tornado_swings(args, spread):
+    """Buy-minus-rent with each input moved down and up by spread, largest swing first.
+
+    All 2 x 10 scenarios are evaluated in one batch. Returns a list of
+    (name, low diff, high diff) and the base diff.
+    """
+    import numpy as np
+    from BatchCalculator import BatchCalculator
+
+    count = len(PARAMETERS)
+    params = {name: np.full(2 * count + 1, float(args[name])) for name in PARAMETERS}
+    for i, name in enumerate(PARAMETERS):
+        params[name][2 * i] *= 1 - spread
+        params[name][2 * i + 1] *= 1 + spread
+    with np.errstate(all='ignore'):
+        diff = BatchCalculator(**params).diff
+    swings = [(name, diff[2 * i], diff[2 * i + 1]) for i, name in enumerate(PARAMETERS)]
+    swings.sort(key=lambda swing: -abs(swing[2] - swing[1]) if np.isfinite(swing[2] - swing[1]) else 0)
+    return swings, diff[-1]
+
+
+class SensitivityPanel:
+    """Heatmap of buy-minus-rent over two inputs and a tornado chart of all inputs.
+
+    Grids are evaluated in batches on a background thread, coarse first, and
+    drawn as a single image on a canvas. A newer request (new inputs or axes)
+    stops the refinement of an older one.
+    """
+
+    SIZE = 300
+
+    def __init__(self, parent, root, font_size=10):
+        self.root = root
+        self.frame = ttk.LabelFrame(parent, text="🌡️ Sensitivity", padding="10")
+        self.args = None
+        self._image = None
+        self._generation = 0
+        self._request = None
+        self._request_lock = threading.Lock()
+        self._request_ready = threading.Event()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+        controls = ttk.Frame(self.frame)
+        controls.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        labels = [parameter_label(name) for name in PARAMETERS]
+        self.x_var = tk.StringVar(value=parameter_label('interest_rate'))
+        self.y_var = tk.StringVar(value=parameter_label('property_value_increase'))
+        self.spread_var = tk.DoubleVar(value=50)
+        ttk.Label(controls, text="X:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Combobox(controls, textvariable=self.x_var, values=labels, state='readonly', width=28).grid(row=0, column=1, sticky=tk.W)
+        ttk.Label(controls, text="Y:").grid(row=1, column=0, sticky=tk.W)
+        ttk.Combobox(controls, textvariable=self.y_var, values=labels, state='readonly', width=28).grid(row=1, column=1, sticky=tk.W)
+        ttk.Label(controls, text="± %:").grid(row=2, column=0, sticky=tk.W)
+        ttk.Spinbox(controls, textvariable=self.spread_var, from_=1, to=100, increment=5, width=6).grid(row=2, column=1, sticky=tk.W)
+        for var in (self.x_var, self.y_var, self.spread_var):
+            var.trace_add('write', lambda *_: self.refresh())
+
+        self.heatmap = tk.Canvas(self.frame, width=self.SIZE + 60, height=self.SIZE + 40, background='white', highlightthickness=0)
+        self.heatmap.grid(row=1, column=0, pady=(10, 0))
+        self.heatmap_item = self.heatmap.create_image(50, 5, anchor=tk.NW)
+        self.tornado = tk.Canvas(self.frame, width=self.SIZE + 60, height=230, background='white', highlightthickness=0)
+        self.tornado.grid(row=2, column=0, pady=(10, 0))
+        self.font = ('Arial', max(8, font_size - 2))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def _name(self, label):
+        return PARAMETERS[[parameter_label(name) for name in PARAMETERS].index(label)]
+
+    def refresh(self, args=None):
+        """Recompute the charts for new inputs (or the last inputs when args is None)"""
+        if args is not None:
+            self.args = dict(args)
+        if self.args is None:
+            return
+        try:
+            spread = self.spread_var.get() / 100
+        except (tk.TclError, ValueError):
+            return
+        self._generation += 1
+        with self._request_lock:
+            self._request = (self._generation, self.args, self._name(self.x_var.get()), self._name(self.y_var.get()), spread)
+            self._request_ready.set()
+
+    def _worker(self):
+        while True:
+            self._request_ready.wait()
+            with self._request_lock:
+                self._request_ready.clear()
+                if self._request is None:
+                    continue
+                generation, args, x_name, y_name, spread = self._request
+                self._request = None
+            try:
+                self.root.after(0, self._draw_tornado, generation, *tornado_swings(args, spread))
+                for resolution in RESOLUTIONS:
+                    # Stop refining once newer inputs are waiting
+                    if self._request_ready.is_set():
+                        break
+                    image = heatmap_image(args, x_name, y_name, resolution, self.SIZE, spread)
+                    self.root.after(0, self._draw_heatmap, generation, x_name, y_name, args, *image)
+            except Exception:
+                # Invalid inputs simply leave the previous charts in place
+                continue
+
+    def _draw_heatmap(self, generation, x_name, y_name, args, data, x_range, y_range, scale):
+        if generation != self._generation:
+            return
+        # Keep a reference to the image, Tk does not
+        self._image = tk.PhotoImage(data=data, format='PPM')
+        canvas = self.heatmap
+        canvas.itemconfigure(self.heatmap_item, image=self._image)
+        canvas.delete('axis')
+        left, top, size = 50, 5, self.SIZE
+        canvas.create_text(left, top + size + 4, text=f"{x_range[0]:,.4g}", anchor=tk.NW, font=self.font, tags='axis')
+        canvas.create_text(left + size, top + size + 4, text=f"{x_range[1]:,.4g}", anchor=tk.NE, font=self.font, tags='axis')
+        canvas.create_text(left + size / 2, top + size + 18, text=parameter_label(x_name), anchor=tk.N, font=self.font, tags='axis')
+        canvas.create_text(left - 4, top + size, text=f"{y_range[0]:,.4g}", anchor=tk.SE, font=self.font, tags='axis')
+        canvas.create_text(left - 4, top, text=f"{y_range[1]:,.4g}", anchor=tk.NE, font=self.font, tags='axis')
+        canvas.create_text(left - 4, top + size / 2, text=parameter_label(y_name), anchor=tk.E, font=self.font, tags='axis', width=45)
+        # Mark the current inputs
+        x = left + (args[x_name] - x_range[0]) / (x_range[1] - x_range[0]) * size
+        y = top + (y_range[1] - args[y_name]) / (y_range[1] - y_range[0]) * size
+        canvas.create_oval(x - 4, y - 4, x + 4, y + 4, outline='black', width=2, tags='axis')
+
+    def _draw_tornado(self, generation, swings, base):
+        if generation != self._generation:
+            return
+        canvas = self.tornado
+        canvas.delete('all')
+        values = [abs(value - base) for _, low, high in swings for value in (low, high) if value == value]
+        scale = max(values) if values and max(values) > 0 else 1.0
+        width = int(canvas['width'])
+        # Parameter names on the left, bars around the base outcome on the right
+        label_width = 150
+        center = label_width + (width - label_width) / 2
+        half = (width - label_width - 10) / 2
+        canvas.create_text(center, 2, text=f"± {self.spread_var.get():g}% on each input (green: better to buy)",
+                           anchor=tk.N, font=self.font)
+        for i, (name, low, high) in enumerate(swings):
+            top = 20 + i * 20
+            for value in (low, high):
+                if value != value:  # NaN
+                    continue
+                end = center + (value - base) / scale * half
+                canvas.create_rectangle(min(center, end), top, max(center, end), top + 14,
+                                        fill='#5cb85c' if value > base else '#d9534f', outline='')
+            canvas.create_text(4, top + 7, text=parameter_label(name), anchor=tk.W, font=self.font)
+        canvas.create_line(center, 18, center, 20 + len(swings) * 20, fill='black')
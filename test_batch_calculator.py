@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+
+from BatchCalculator import BatchCalculator
+from HomeCalculator import HomeCalculator
+from ParameterSweep import parse_values
+
+SCENARIO = dict(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200, rent=4200, rent_increase=0.3,
+                alternative_investment_increase=0.3, property_value=1600000, property_value_increase=4.5, interest_rate=5)
+
+
+@pytest.mark.parametrize('alternative_investment_increase', [
+    # 0.30000000000000004, from the sweep range 0.2:0.4:0.1
+    *parse_values('0.2:0.4:0.1'),
+    0.3,
+    math.nextafter(0.3, 0),
+    0.3 + 1e-10,
+])
+def test_close_rates_match_cost_table(alternative_investment_increase):
+    scenario = dict(SCENARIO, alternative_investment_increase=alternative_investment_increase)
+    batch = BatchCalculator(**scenario)
+    # The monthly table sums the investment column term by term, without cancellation
+    expected = HomeCalculator(**scenario).cost_table.df['investment'].sum()
+    assert float(batch.total_investment_value) == pytest.approx(expected, rel=1e-10)
+
+
+def test_rent_factor_is_continuous_across_equal_rates():
+    a = np.full(5, 0.07)
+    g = np.array([0.07 - 1e-6, np.nextafter(0.07, 0), 0.07, np.nextafter(0.07, 1), 0.07 + 1e-6])
+    factor = BatchCalculator.rent_factor(a, g, 30, (1 + a) ** 30)
+    limit = 30 * 1.07 ** 29
+    np.testing.assert_allclose(factor[1:4], limit, rtol=1e-13)
+    np.testing.assert_allclose(factor[[0, 4]], limit, rtol=1e-4)
+    assert factor[0] < limit < factor[4]
+
+
+def test_interest_free_loan():
+    batch = BatchCalculator(**dict(SCENARIO, interest_rate=np.array([0.0, 5.0])))
+    assert batch.monthly_payment[0] == pytest.approx(1210000 / 360)
+    assert np.isfinite(batch.diff).all()
@@ -0,0 +1,98 @@
+from fractions import Fraction
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from CostTable import CostTable
+
+
+def baseline_df(years, capital, monthly_mortgage, monthly_maintenance, rent, rent_increase, alternative_investment_increase):
+    """The original row-by-row table, built with list comprehensions"""
+    years = int(years)
+
+    def calculate_rent(month):
+        if month <= 0:
+            return 0
+        return rent * (1 + rent_increase / 100) ** int((month - 1) // 12)
+
+    df = pd.DataFrame({
+        'buying_cost': [capital] + [(monthly_mortgage + monthly_maintenance) for i in range(1, years * 12 + 1)],
+        'renting_cost': [calculate_rent(i) for i in range(0, years * 12 + 1)],
+    }, index=[i for i in range(0, years * 12 + 1)])
+    df.index.name = 'month'
+    df['diff'] = df['buying_cost'] - df['renting_cost']
+    df['investment'] = df['diff'] * ((1 + alternative_investment_increase / 100) ** (1 / 12)) ** (years * 12 - df.index)
+    return df
+
+
+def random_scenario(rng):
+    return dict(
+        years=rng.randint(1, 40),
+        capital=rng.uniform(0, 1000000),
+        monthly_mortgage=rng.uniform(0, 20000),
+        monthly_maintenance=rng.uniform(0, 1000),
+        rent=rng.uniform(500, 10000),
+        rent_increase=rng.uniform(-2, 8),
+        alternative_investment_increase=rng.uniform(-2, 12),
+    )
+
+
+def scenarios():
+    rng = random.Random(0)
+    cases = [random_scenario(rng) for _ in range(50)]
+    # The closed forms have separate branches for a == g and a == 0 (and g == 0), and the rent
+    # series must not cancel when a and g are close but not equal (e.g. steps of a sweep range)
+    for a, g in ((5, 5), (0, 3), (0, 0), (7, 0), (-1.5, -1.5),
+                 (7, math.nextafter(7, 0)), (0.30000000000000004, 0.3), (5, 5 + 1e-10), (-1.5, -1.5 + 1e-12),
+                 (0, 1e-12), (1e-12, 0), (0, math.nextafter(0, 1)), (1e-10, 1e-10 + 1e-22)):
+        cases.append(dict(random_scenario(rng), alternative_investment_increase=a, rent_increase=g))
+    return cases
+
+
+@pytest.mark.parametrize('scenario', scenarios())
+def test_totals_match_baseline(scenario):
+    expected = baseline_df(**scenario)
+    table = CostTable(**scenario)
+    assert table.total_buying_cost() == pytest.approx(expected['buying_cost'].sum(), rel=1e-10)
+    assert table.total_rent_paid() == pytest.approx(expected['renting_cost'].sum(), rel=1e-10)
+    assert table.total_investment_value() == pytest.approx(expected['investment'].sum(), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('scenario', scenarios())
+def test_df_matches_baseline(scenario):
+    expected = baseline_df(**scenario)
+    df = CostTable(**scenario).df
+    assert list(df.columns) == ['buying_cost', 'renting_cost', 'diff', 'investment']
+    pd.testing.assert_frame_equal(df, expected, check_index_type=False, rtol=1e-12)
+
+
+def exact_rent_factor(a, g, years):
+    """Sum over y of (1 + g) ** y * (1 + a) ** (years - 1 - y) in exact rational arithmetic"""
+    a, g = 1 + Fraction(a), 1 + Fraction(g)
+    return float(sum(g ** y * a ** (years - 1 - y) for y in range(years)))
+
+
+@pytest.mark.parametrize('years', [1, 2, 10, 30, 40])
+@pytest.mark.parametrize('a', [0.07, 0.02, 0.0, -0.01])
+@pytest.mark.parametrize('g', [
+    pytest.param(lambda a: a, id='equal'),
+    pytest.param(lambda a: math.nextafter(a, 1), id='1 ulp above'),
+    pytest.param(lambda a: math.nextafter(a, -1), id='1 ulp below'),
+    pytest.param(lambda a: a + 1e-12, id='1e-12 apart'),
+    pytest.param(lambda a: a - 0.03, id='apart'),
+])
+def test_rent_factor_close_rates(years, a, g):
+    # (1+a)^n - (1+g)^n over a - g cancels to garbage when a and g are close but not equal
+    g = g(a)
+    assert CostTable.rent_factor(a, g, years) == pytest.approx(exact_rent_factor(a, g, years), rel=1e-12)
+
+
+@pytest.mark.parametrize('inflation', [2, 2.0000001, math.nextafter(2, 3), 1.5, 0])
+def test_real_totals_match_table(inflation):
+    # The present value of rent sums the same series as the investment, at the inflation rate
+    table = CostTable(years=30, capital=500000, monthly_mortgage=8000, monthly_maintenance=200, rent=4200,
+                      rent_increase=2, alternative_investment_increase=7, inflation=inflation)
+    assert table.real_total_rent_paid() == pytest.approx(table.df['real_renting_cost'].sum(), rel=1e-12)
+    assert table.real_total_buying_cost() == pytest.approx(table.df['real_buying_cost'].sum(), rel=1e-12)
@@ -0,0 +1,54 @@
+from decimal import Decimal, localcontext
+import math
+
+import pytest
+
+from GradientCalculator import GradientCalculator
+
+SCENARIO = dict(years=30, capital=500000, purchase_cost=110000, monthly_maintenance=200, rent=4200, rent_increase=3,
+                alternative_investment_increase=7, property_value=1600000, property_value_increase=4.5, interest_rate=5)
+CONTINUOUS = [name for name in SCENARIO if name != 'years']
+
+
+def reference_diff(params):
+    """Buy-minus-rent from the month-by-month definition in 60-digit decimal arithmetic"""
+    p = {name: Decimal(value) for name, value in params.items()}
+    years = int(params['years'])
+    months = years * 12
+    r = p['interest_rate'] / 1200
+    growth = (1 + r) ** months
+    payment = (p['property_value'] + p['purchase_cost'] - p['capital']) * r * growth / (growth - 1)
+    root = ((1 + p['alternative_investment_increase'] / 100).ln() / 12).exp()
+    rent_growth = 1 + p['rent_increase'] / 100
+    investment = p['capital'] * root ** months
+    for month in range(1, months + 1):
+        rent = p['rent'] * rent_growth ** ((month - 1) // 12)
+        investment += (payment + p['monthly_maintenance'] - rent) * root ** (months - month)
+    return p['property_value'] * (1 + p['property_value_increase'] / 100) ** years - investment
+
+
+def reference_gradient(params, name):
+    """Central difference of reference_diff, exact to far more digits than float64"""
+    with localcontext() as context:
+        context.prec = 60
+        h = Decimal('1e-20')
+        up = reference_diff(dict(params, **{name: Decimal(params[name]) + h}))
+        down = reference_diff(dict(params, **{name: Decimal(params[name]) - h}))
+        return float((up - down) / (2 * h))
+
+
+@pytest.mark.parametrize('rent_increase', [
+    pytest.param(7, id='equal'),
+    pytest.param(math.nextafter(7, 0), id='1 ulp below'),
+    pytest.param(7 + 1e-10, id='1e-10 apart'),
+    # Either side of where the closed form of the series slope takes over from the direct sum
+    pytest.param(7.3, id='0.3 apart'),
+    pytest.param(7.4, id='0.4 apart'),
+    pytest.param(3, id='apart'),
+])
+def test_gradient_near_equal_rates(rent_increase):
+    # The rent series divides by a - g in its plain closed form, so near-equal rates are the hard case
+    params = dict(SCENARIO, rent_increase=rent_increase)
+    gradient = GradientCalculator(**params).gradient
+    for name in CONTINUOUS:
+        assert float(gradient[name]) == pytest.approx(reference_gradient(params, name), rel=1e-9, abs=1e-6), name
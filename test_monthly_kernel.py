@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from BatchCalculator import BatchCalculator
+from MonthlyKernel import NUMBA_AVAILABLE, OUTPUTS, constant_paths, simulate_months
+
+BACKENDS = [
+    pytest.param('numba', marks=pytest.mark.skipif(not NUMBA_AVAILABLE, reason='numba is not installed')),
+    'numpy',
+]
+
+
+def random_inputs(scenarios=64, months=240, seed=0):
+    """Path-dependent inputs: rate resets, zero rates, prepayments, negative loans and terms shorter than the horizon"""
+    rng = np.random.default_rng(seed)
+    # Piecewise constant rates, changing every five years, some of them zero
+    rate = np.repeat(rng.uniform(0, 0.01, (scenarios, months // 60)), 60, axis=1)
+    rate[rng.random(rate.shape) < 0.05] = 0
+    prepayment = np.where(rng.random((scenarios, months)) < 0.02, rng.uniform(0, 50000, (scenarios, months)), 0)
+    return dict(
+        loan_amount=rng.uniform(-200000, 1500000, scenarios),
+        term=rng.integers(120, 361, scenarios),
+        capital=rng.uniform(100000, 1000000, scenarios),
+        monthly_maintenance=rng.uniform(0, 1000, scenarios),
+        property_value=rng.uniform(1000000, 3000000, scenarios),
+        rate=rate,
+        investment_return=rng.normal(0.005, 0.02, (scenarios, months)),
+        property_return=rng.normal(0.003, 0.01, (scenarios, months)),
+        rent=rng.uniform(1000, 10000, (scenarios, 1)) * np.cumprod(1 + rng.uniform(0, 0.004, (scenarios, months)), axis=1),
+        prepayment=prepayment,
+    )
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason='numba is not installed')
+def test_numba_matches_numpy():
+    inputs = random_inputs()
+    compiled = simulate_months(**inputs, backend='numba')
+    vectorized = simulate_months(**inputs, backend='numpy')
+    for name in OUTPUTS:
+        np.testing.assert_allclose(compiled[name], vectorized[name], rtol=1e-10, atol=1e-6, err_msg=name)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_constant_rates_match_closed_form(backend):
+    rng = np.random.default_rng(1)
+    size = 32
+    scenario = dict(
+        years=rng.integers(1, 31, size),
+        capital=rng.uniform(100000, 1000000, size),
+        purchase_cost=rng.uniform(0, 200000, size),
+        monthly_maintenance=rng.uniform(0, 1000, size),
+        rent=rng.uniform(1000, 10000, size),
+        rent_increase=rng.uniform(0, 6, size),
+        alternative_investment_increase=rng.uniform(0, 10, size),
+        property_value=rng.uniform(1000000, 3000000, size),
+        property_value_increase=rng.uniform(0, 8, size),
+        interest_rate=rng.uniform(1, 10, size),
+    )
+    # Cover the zero-return and equal-growth branches of the closed forms
+    scenario['alternative_investment_increase'][:4] = 0
+    scenario['rent_increase'][4:8] = scenario['alternative_investment_increase'][4:8]
+    batch = BatchCalculator(**scenario)
+
+    # Every scenario is simulated over its own horizon, one at a time
+    for s in range(size):
+        months = int(scenario['years'][s]) * 12
+        paths = constant_paths(months, scenario['interest_rate'][s], scenario['alternative_investment_increase'][s],
+                               scenario['property_value_increase'][s], scenario['rent'][s], scenario['rent_increase'][s])
+        result = simulate_months(batch.mortgage[s], months, scenario['capital'][s], scenario['monthly_maintenance'][s],
+                                 scenario['property_value'][s], **paths, backend=backend)
+        assert result['payment'][0, 1] == pytest.approx(batch.monthly_payment[s], rel=1e-10)
+        assert result['balance'][0, -1] == pytest.approx(0, abs=1e-6)
+        assert result['buying_cost'][0].sum() == pytest.approx(batch.total_buying_cost[s], rel=1e-10)
+        assert result['renting_cost'][0].sum() == pytest.approx(batch.total_rent_paid[s], rel=1e-10)
+        assert result['investment'][0, -1] == pytest.approx(batch.total_investment_value[s], rel=1e-9)
+        assert result['home_value'][0, -1] == pytest.approx(batch.property_future_value[s], rel=1e-10)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_negative_loan_is_left_unpaid(backend):
+    # Capital above the price and costs: the loan is negative and nothing is paid on it
+    months = 120
+    paths = constant_paths(months, np.full(3, 5.0), 7, 3, 4000, 2)
+    result = simulate_months(np.array([-100000.0, 0.0, 200000.0]), months, 900000, 200, 800000, **paths, backend=backend)
+    np.testing.assert_array_equal(result['balance'][0], -100000)
+    np.testing.assert_array_equal(result['balance'][1], 0)
+    np.testing.assert_array_equal(result['payment'][:2], 0)
+    assert result['balance'][2, -1] == 0
+    assert result['payment'][2, 1] > 0